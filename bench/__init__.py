@@ -0,0 +1 @@
+"""Benchmarks for the e-Bloc Romania integration, run against tests.fake_ebloc."""
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import pytest
+
+from tests.conftest import auto_enable_custom_integrations, fake_ebloc, make_coordinator
+
+from .harness import Bench
+
+__all__ = ["auto_enable_custom_integrations", "fake_ebloc", "make_coordinator"]
+
+_BENCH = Bench.from_file()
+
+
+@pytest.fixture
+def bench() -> Bench:
+    """Shared recorder; each test asserts its own measurements against thresholds.json."""
+    return _BENCH
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    if _BENCH.results:
+        terminalreporter.section("e-Bloc benchmarks")
+        for line in _BENCH.report():
+            terminalreporter.write_line(line)
@@ -0,0 +1,86 @@
+"""Measure wall clock, CPU, peak memory and e-Bloc requests, and enforce thresholds."""
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from tests.fake_ebloc import FakeEBloc
+
+THRESHOLDS = Path(__file__).with_name("thresholds.json")
+
+
+@dataclass
+class Measurement:
+    name: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_kib: float | None = None
+    requests: int | None = None
+    # Scenario-specific figures (e.g. months fetched); also checked against thresholds
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    def metrics(self) -> dict[str, Any]:
+        out = {k: v for k, v in asdict(self).items() if k not in ("name", "extra")}
+        out.update(self.extra)
+        return out
+
+
+class Bench:
+    """Collects measurements; a metric above its threshold fails the benchmark."""
+
+    def __init__(self, thresholds: dict[str, dict[str, float]]) -> None:
+        self.thresholds = thresholds
+        self.results: list[Measurement] = []
+
+    @classmethod
+    def from_file(cls, path: Path = THRESHOLDS) -> Bench:
+        return cls(json.loads(path.read_text(encoding="utf-8")))
+
+    @contextmanager
+    def measure(
+        self, name: str, server: FakeEBloc | None = None, trace_memory: bool = True
+    ) -> Iterator[Measurement]:
+        """Time the block; tracing memory slows Python several times, so timing-only
+        scenarios pass trace_memory=False and report no peak."""
+        m = Measurement(name)
+        if server is not None:
+            server.reset_counters()
+        if trace_memory:
+            tracemalloc.start()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield m
+        finally:
+            m.wall_s = round(time.perf_counter() - wall, 4)
+            m.cpu_s = round(time.process_time() - cpu, 4)
+            if trace_memory:
+                m.peak_kib = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+                tracemalloc.stop()
+            if server is not None:
+                m.requests = server.total_requests
+        self.results.append(m)
+
+    def violations(self, m: Measurement) -> list[str]:
+        limits = self.thresholds.get(m.name, {})
+        metrics = m.metrics()
+        return [
+            f"{m.name}: {key}={metrics[key]} > {limit}"
+            for key, limit in limits.items()
+            if metrics.get(key) is not None and metrics[key] > limit
+        ]
+
+    def report(self) -> list[str]:
+        lines = [f"{'benchmark':<36} {'wall s':>8} {'cpu s':>8} {'peak KiB':>10} {'req':>6}  extra"]
+        for m in self.results:
+            req = "" if m.requests is None else m.requests
+            peak = "" if m.peak_kib is None else m.peak_kib
+            extra = " ".join(f"{k}={v}" for k, v in m.extra.items())
+            lines.append(f"{m.name:<36} {m.wall_s:>8} {m.cpu_s:>8} {peak:>10} {req:>6}  {extra}")
+        return lines
@@ -0,0 +1,37 @@
+"""Wall clock of the history fetch as history_months grows, against a serial baseline."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from custom_components.ebloc_ro.history import prev_months
+from tests.fake_ebloc import generate
+
+# Large enough that round trips, not CPU, dominate a serial fetch
+LATENCY = 0.05
+
+
+@pytest.mark.parametrize("months", [1, 12, 60, 120])
+async def test_history_months_sweep(bench, fake_ebloc, make_coordinator, months: int) -> None:
+    (asoc,) = generate(apartments=10, months=120)
+    server = await fake_ebloc([asoc], latency=LATENCY)
+    window = prev_months(asoc.luna_afisata, months)
+
+    # The same fetch one month at a time, from a coordinator with a cold cache
+    serial = await make_coordinator(asoc.cookie("4"), history_months=months, max_concurrency=1)
+    started = time.perf_counter()
+    assert len(await serial._fetch_months(window)) == months
+    serial_s = time.perf_counter() - started
+
+    coordinator = await make_coordinator(asoc.cookie("3"), history_months=months)
+    with bench.measure(f"history_{months}", server, trace_memory=False) as m:
+        fetched = await coordinator._fetch_months(window)
+    m.extra.update(
+        months=len(fetched),
+        serial_s=round(serial_s, 3),
+        serial_ratio=round(m.wall_s / serial_s, 2),
+    )
+    assert len(fetched) == months
+    assert bench.violations(m) == []
@@ -0,0 +1,39 @@
+"""amount_cents against the parser sensor.py used before money.py."""
+
+from __future__ import annotations
+
+import timeit
+
+import pytest
+
+from custom_components.ebloc_ro.money import _amount_cents, amount_cents
+from tests.legacy_money import _parse_amount
+
+ROUNDS = 20000
+
+
+def _per_call_us(fns, value: str) -> list[float]:
+    """Best per-call time of each parser, with runs interleaved so noise hits all alike."""
+    best = [float("inf")] * len(fns)
+    for _ in range(7):
+        for i, fn in enumerate(fns):
+            t = timeit.timeit(lambda fn=fn: fn(value), number=ROUNDS)
+            best[i] = min(best[i], t / ROUNDS * 1e6)
+    return best
+
+
+@pytest.mark.parametrize("value", ["270,49", "27049", "1.234,56 RON"])
+def test_amount_cents_vs_legacy(bench, value: str) -> None:
+    with bench.measure(f"money_{value.split()[0]}", trace_memory=False) as m:
+        legacy, uncached, cached = _per_call_us(
+            [_parse_amount, lambda v: _amount_cents.__wrapped__(v.strip()), amount_cents], value
+        )
+        m.extra.update(
+            legacy_us=round(legacy, 3),
+            uncached_us=round(uncached, 3),
+            cached_us=round(cached, 3),
+            uncached_ratio=round(uncached / legacy, 2),
+            cached_ratio=round(cached / legacy, 2),
+        )
+    assert amount_cents(value) == round(_parse_amount(value) * 100)
+    assert bench.violations(m) == []
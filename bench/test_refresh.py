@@ -0,0 +1,83 @@
+"""Requests, wall clock, CPU and memory of one coordinator refresh."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.ebloc_ro.api import EBlocAPI
+from tests.fake_ebloc import generate
+
+
+async def _refresh(coordinator) -> None:
+    await coordinator._async_update_data()
+    if coordinator._backfill_task is not None:
+        await coordinator._backfill_task
+
+
+SIZES = [10, 50, 200]
+
+
+@pytest.mark.parametrize("apartments", SIZES)
+async def test_first_and_steady_refresh(
+    bench, fake_ebloc, make_coordinator, monkeypatch, apartments: int
+) -> None:
+    """One apartment's entry: cost should not grow with the association."""
+    # A real steady-state refresh comes minutes later, past the coalescing window
+    monkeypatch.setattr(EBlocAPI, "COALESCE_TTL", 0)
+    (asoc,) = generate(apartments=apartments, months=12)
+    server = await fake_ebloc([asoc], latency=0.005)
+    coordinator = await make_coordinator(asoc.cookie("3"), history_months=12, backfill_rpm=60000)
+
+    with bench.measure(f"refresh_first_{apartments}", server) as m:
+        await _refresh(coordinator)
+        m.extra["kib_sent"] = round(server.bytes_sent / 1024, 1)
+    assert bench.violations(m) == []
+
+    with bench.measure(f"refresh_steady_{apartments}", server) as m:
+        await _refresh(coordinator)
+        m.extra["kib_sent"] = round(server.bytes_sent / 1024, 1)
+    assert bench.violations(m) == []
+
+
+@pytest.mark.parametrize("apartments", SIZES)
+async def test_whole_association_refresh(
+    bench, fake_ebloc, make_coordinator, apartments: int
+) -> None:
+    """An entry without id_ap reads every apartment's rows: cost grows with the association."""
+    (asoc,) = generate(apartments=apartments, months=12)
+    server = await fake_ebloc([asoc], latency=0.005)
+    coordinator = await make_coordinator(
+        f"PHPSESSID=admin; asoc-cur={asoc.id_asoc}", history_months=12, backfill_rpm=60000
+    )
+
+    with bench.measure(f"refresh_association_{apartments}", server) as m:
+        await _refresh(coordinator)
+        m.extra["kib_sent"] = round(server.bytes_sent / 1024, 1)
+    assert coordinator.data is None or coordinator.data.luna == asoc.luna_afisata
+    assert bench.violations(m) == []
+
+
+async def test_refresh_with_flaky_site(bench, fake_ebloc, make_coordinator, monkeypatch) -> None:
+    monkeypatch.setattr("custom_components.ebloc_ro.api.RETRY_BACKOFF_BASE", 0.01)
+    (asoc,) = generate(apartments=10, months=12)
+    server = await fake_ebloc([asoc], latency=0.005, error_rate=0.2, seed=7)
+    coordinator = await make_coordinator(asoc.cookie("3"), history_months=12, backfill_rpm=60000)
+
+    with bench.measure("refresh_flaky", server) as m:
+        await _refresh(coordinator)
+        m.extra["retried"] = sum(st.errors for st in coordinator.api.stats.values())
+    assert bench.violations(m) == []
+
+
+@pytest.mark.parametrize("gaps", [0, 6, 12, 18])
+async def test_requests_follow_real_months(bench, fake_ebloc, make_coordinator, gaps: int) -> None:
+    (asoc,) = generate(apartments=10, months=24, gaps=gaps)
+    server = await fake_ebloc([asoc])
+    coordinator = await make_coordinator(asoc.cookie("3"), history_months=24, backfill_rpm=60000)
+
+    with bench.measure(f"real_months_{24 - gaps}", server, trace_memory=False) as m:
+        await _refresh(coordinator)
+        m.extra["month_requests"] = server.requests["AjaxGetIndexContoare.php"]
+    # Months without readings in the 24-month window are never requested
+    assert m.extra["month_requests"] == len(asoc.months)
+    assert bench.violations(m) == []
@@ -0,0 +1,18 @@
+"""Polls per year with calendar-aware scheduling against the fixed default interval."""
+
+from __future__ import annotations
+
+from tests.calendar_sim import DEFAULT_INTERVAL, fixed_interval_polls, poll_year
+
+
+def test_year_of_polls(bench) -> None:
+    with bench.measure("scheduler_year", trace_memory=False) as m:
+        polls = len(poll_year(DEFAULT_INTERVAL))
+    baseline = fixed_interval_polls()
+    m.extra.update(
+        polls=polls,
+        baseline_polls=baseline,
+        polls_ratio=round(polls / baseline, 3),
+        reduction=round(baseline / polls, 2),
+    )
+    assert bench.violations(m) == []
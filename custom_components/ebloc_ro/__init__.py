@@ -1,34 +1,114 @@
 from __future__ import annotations
 
 import logging
+import os
+from pathlib import Path
 
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import (
+    ConfigEntryAuthFailed,
+    ConfigEntryNotReady,
+    HomeAssistantError,
+)
+from homeassistant.helpers import config_validation as cv
 
-from .const import DOMAIN
+from .const import DOMAIN, SERVICE_EXPORT_HISTORY, SERVICE_INVALIDATE_CACHE
 from .coordinator import EBlocCoordinator
+from .hub import release_hub
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[str] = ["sensor"]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_FILENAME = "filename"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_FORMAT = "format"
+
+INVALIDATE_CACHE_SCHEMA = vol.Schema({vol.Optional(ATTR_ENTRY_ID): cv.string})
+EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_FILENAME): cv.string,
+        vol.Optional(ATTR_START): cv.date,
+        vol.Optional(ATTR_END): cv.date,
+        vol.Optional(ATTR_FORMAT): vol.In(["csv", "jsonl"]),
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    async def _invalidate_cache(call: ServiceCall) -> None:
+        entry_id = call.data.get(ATTR_ENTRY_ID)
+        for eid, coordinator in list(hass.data.get(DOMAIN, {}).items()):
+            if isinstance(coordinator, EBlocCoordinator) and entry_id in (None, eid):
+                await coordinator.async_invalidate_cache()
+
+    async def _export_history(call: ServiceCall) -> ServiceResponse:
+        coordinator = hass.data.get(DOMAIN, {}).get(call.data[ATTR_ENTRY_ID])
+        if not isinstance(coordinator, EBlocCoordinator):
+            raise HomeAssistantError("Intrare e-Bloc necunoscută sau neîncărcată")
+        # realpath follows symlinks, so a link inside the config dir cannot point outside it
+        config_dir, target = await hass.async_add_executor_job(
+            lambda: (
+                os.path.realpath(hass.config.config_dir),
+                os.path.realpath(hass.config.path(call.data[ATTR_FILENAME])),
+            )
+        )
+        if target == config_dir or os.path.commonpath([config_dir, target]) != config_dir:
+            raise HomeAssistantError("Fișierul trebuie să fie în directorul de configurare")
+        start, end = call.data.get(ATTR_START), call.data.get(ATTR_END)
+        if start and end and start > end:
+            raise HomeAssistantError("Data de început este după data de sfârșit")
+        fmt = call.data.get(ATTR_FORMAT) or ("csv" if target.lower().endswith(".csv") else "jsonl")
+        return await coordinator.async_export_history(Path(target), start, end, fmt)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_INVALIDATE_CACHE, _invalidate_cache, schema=INVALIDATE_CACHE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        _export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    coordinator = EBlocCoordinator(hass, entry)
     try:
-        coordinator = EBlocCoordinator(hass, entry)
-        await coordinator.async_config_entry_first_refresh()
+        await coordinator.async_load_cache()
+        if not coordinator.restored:
+            await coordinator.async_config_entry_first_refresh()
+    except ConfigEntryAuthFailed:
+        release_hub(hass, entry.entry_id, coordinator.hub)
+        raise
     except Exception as err:  # noqa: BLE001
+        release_hub(hass, entry.entry_id, coordinator.hub)
         _LOGGER.exception("Setup failed: %s", err)
         raise ConfigEntryNotReady from err
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if coordinator.restored:
+        # Fast start: entities came up from the saved snapshot, fetch fresh data in the background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+        )
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if coordinator is not None:
+            release_hub(hass, entry.entry_id, coordinator.hub)
     return unload_ok
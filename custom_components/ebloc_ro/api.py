@@ -1,41 +1,248 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
+import random
+import re
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Any
 
 import aiohttp
 
-from .const import HEADER_UA
+from .const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_OPEN_SECONDS,
+    CONNECT_TIMEOUT,
+    HEADER_UA,
+    MAX_RESPONSE_BYTES,
+    READ_TIMEOUT,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF_BASE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class EBlocAuthError(Exception):
+class EBlocError(Exception):
     pass
 
 
+class EBlocAuthError(EBlocError):
+    pass
+
+
+class EBlocUnavailable(EBlocError):
+    """e-bloc.ro unreachable: retries exhausted or the circuit breaker is open."""
+
+
+# Transient server answers worth retrying
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitBreaker:
+    """Stop calling the site for a while after repeated transport failures.
+
+    After CIRCUIT_OPEN_SECONDS the circuit is half-open: exactly one trial
+    request is let through while every other caller is still refused. A
+    failure re-opens the circuit, a success closes it; a trial that never
+    reports back (cancelled) frees its slot after another cooldown.
+    """
+
+    def __init__(
+        self,
+        threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        cooldown: float = CIRCUIT_OPEN_SECONDS,
+    ) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return (
+            self.failures >= self.threshold and time.monotonic() - self._opened_at < self.cooldown
+        )
+
+    @property
+    def half_open(self) -> bool:
+        return self.failures >= self.threshold and not self.is_open
+
+    def before(self) -> None:
+        if self.is_open:
+            raise EBlocUnavailable("e-bloc.ro indisponibil (circuit deschis)")
+        if self.half_open:
+            now = time.monotonic()
+            if self._trial_at is not None and now - self._trial_at < self.cooldown:
+                raise EBlocUnavailable("e-bloc.ro indisponibil (se testează conexiunea)")
+            self._trial_at = now
+
+    def success(self) -> None:
+        self.failures = 0
+        self._trial_at = None
+
+    def failure(self) -> None:
+        self.failures += 1
+        self._trial_at = None
+        if self.failures >= self.threshold:
+            self._opened_at = time.monotonic()
+
+
+SESSION_UNKNOWN = "unknown"
+SESSION_VALID = "valid"
+SESSION_EXPIRED = "expired"
+
+
+def _is_login_page(txt: str) -> bool:
+    low = txt.lower()
+    return "login" in low and "password" in low
+
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+@dataclass(slots=True)
+class EndpointStats:
+    requests: int = 0
+    errors: int = 0
+    unchanged: int = 0
+    bytes_received: int = 0
+    decode_seconds: float = 0.0
+    latency_seconds: float = 0.0
+    latency_buckets: list[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+
+    def observe(self, seconds: float) -> None:
+        self.latency_seconds += seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.latency_buckets[i] += 1
+                break
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "unchanged": self.unchanged,
+            "bytes_received": self.bytes_received,
+            "decode_seconds": round(self.decode_seconds, 4),
+            "latency_seconds": round(self.latency_seconds, 4),
+            "latency_histogram": {
+                f"le_{bound}": count
+                for bound, count in zip(LATENCY_BUCKETS, self.latency_buckets, strict=True)
+            },
+        }
+
+
+_WS = re.compile(r"\s*")
+_DECODER = json.JSONDecoder()
+
+
+def _filter_rows(text: str, keep: Callable[[dict], bool]) -> Any:
+    """Decode a top-level {"1": {...}, "2": {...}} object one row at a time.
+
+    Rows rejected by keep are dropped as soon as they are decoded, so only the
+    kept rows are ever held as Python objects.
+    """
+    idx = _WS.match(text, 0).end()
+    if text[idx : idx + 1] != "{":
+        return json.loads(text)
+    out: dict[str, Any] = {}
+    idx = _WS.match(text, idx + 1).end()
+    if text[idx] == "}":
+        return out
+    while True:
+        key, idx = _DECODER.raw_decode(text, idx)
+        idx = _WS.match(text, idx).end()
+        if text[idx] != ":":
+            raise ValueError(f"Expected ':' at {idx}")
+        val, idx = _DECODER.raw_decode(text, _WS.match(text, idx + 1).end())
+        if not isinstance(val, dict) or keep(val):
+            out[key] = val
+        idx = _WS.match(text, idx).end()
+        if text[idx] == "}":
+            return out
+        if text[idx] != ",":
+            raise ValueError(f"Expected ',' at {idx}")
+        idx = _WS.match(text, idx + 1).end()
+
+
 class EBlocAPI:
     BASE = "https://www.e-bloc.ro"
     AJAX = BASE + "/ajax"
+    # Identical requests completed this recently are answered from memory
+    COALESCE_TTL = 30.0
+    # Decoded results kept for the body-hash short-circuit, per (endpoint, params)
+    DECODED_CACHE_SIZE = 512
 
-    def __init__(self, session: aiohttp.ClientSession, cookie: str) -> None:
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        cookie: str,
+        max_body: int = MAX_RESPONSE_BYTES,
+        breaker: CircuitBreaker | None = None,
+        base_url: str | None = None,
+    ) -> None:
+        # base_url lets the client target a local stand-in for e-bloc.ro (benchmarks, replays)
+        self.base = (base_url or self.BASE).rstrip("/")
+        self.ajax = self.base + "/ajax"
         self._session = session
         self._cookie = cookie.strip()
+        self.max_body = max_body
+        self.breaker = breaker or CircuitBreaker()
+        self._timeout = aiohttp.ClientTimeout(
+            total=None, connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT
+        )
+        self._headers: Mapping[str, str] = MappingProxyType(
+            {
+                "User-Agent": HEADER_UA,
+                "Accept": "application/json, text/javascript, */*; q=0.01",
+                "Content-Type": "application/x-www-form-urlencoded",
+                "Origin": self.base,
+                "Referer": self.base + "/index.php",
+                "X-Requested-With": "XMLHttpRequest",
+                "Cookie": self._cookie,
+            }
+        )
+        self.stats: dict[str, EndpointStats] = {}
         self.id_asoc: str | None = None
         self.id_ap: str | None = None
+        self.session_state = SESSION_UNKNOWN
+        self._discover_lock = asyncio.Lock()
+        self._inflight: dict[tuple[str, ...], asyncio.Task] = {}
+        self._recent: dict[tuple[str, ...], tuple[float, Any]] = {}
+        self.coalesce_hits = 0
+        self.coalesce_misses = 0
+        self._decoded: dict[tuple[str, ...], tuple[bytes, Any]] = {}
 
-    def headers(self) -> dict[str, str]:
+    @property
+    def request_count(self) -> int:
+        return sum(st.requests for st in self.stats.values())
+
+    def diagnostics(self) -> dict[str, Any]:
         return {
-            "User-Agent": HEADER_UA,
-            "Accept": "application/json, text/javascript, */*; q=0.01",
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Origin": self.BASE,
-            "Referer": self.BASE + "/index.php",
-            "X-Requested-With": "XMLHttpRequest",
-            "Cookie": self._cookie,
+            "session_state": self.session_state,
+            "circuit_open": self.breaker.is_open,
+            "circuit_half_open": self.breaker.half_open,
+            "circuit_failures": self.breaker.failures,
+            "coalesce_hits": self.coalesce_hits,
+            "coalesce_misses": self.coalesce_misses,
+            "endpoints": {name: st.as_dict() for name, st in self.stats.items()},
         }
 
+    @property
+    def session_valid(self) -> bool:
+        return self.session_state == SESSION_VALID
+
+    def headers(self) -> Mapping[str, str]:
+        return self._headers
+
     def _extract_ids_from_cookie(self) -> None:
         ck = self._cookie
         parts = {}
@@ -54,76 +261,227 @@ class EBlocAPI:
             except Exception:
                 pass
 
+    async def _coalesced(self, key: tuple[str, ...], fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Collapse identical in-flight or recently completed requests into one call."""
+        now = time.monotonic()
+        recent = self._recent.get(key)
+        if recent is not None and now - recent[0] < self.COALESCE_TTL:
+            self.coalesce_hits += 1
+            return recent[1]
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesce_hits += 1
+            return await asyncio.shield(task)
+
+        self.coalesce_misses += 1
+        task = asyncio.ensure_future(fetch())
+
+        def _done(t: asyncio.Task) -> None:
+            # The fetch outlives cancelled waiters, so it is forgotten only once it ends
+            if self._inflight.get(key) is t:
+                del self._inflight[key]
+            # Mark the exception as retrieved even if every waiter was cancelled
+            t.cancelled() or t.exception()
+
+        task.add_done_callback(_done)
+        self._inflight[key] = task
+        result = await asyncio.shield(task)
+        self._recent = {k: v for k, v in self._recent.items() if now - v[0] < self.COALESCE_TTL}
+        self._recent[key] = (time.monotonic(), result)
+        return result
+
+    def cancel_inflight(self) -> None:
+        """Cancel fetches still running after their waiters went away (on unload)."""
+        for task in list(self._inflight.values()):
+            task.cancel()
+
+    def clear_coalesce_cache(self) -> None:
+        self._recent.clear()
+        self._decoded.clear()
+
+    def _invalidate_session(self) -> None:
+        self.session_state = SESSION_UNKNOWN
+        self._recent = {k: v for k, v in self._recent.items() if k[0] != "AjaxGetHomeAp.php"}
+
     async def discover(self) -> None:
         """Validate cookie and extract asoc/ap identifiers by pinging an endpoint."""
         self._extract_ids_from_cookie()
         if not self.id_asoc:
+            self.session_state = SESSION_EXPIRED
             raise EBlocAuthError("Cookie invalid: lipseste asoc-cur")
-        url = f"{self.AJAX}/AjaxGetHomeAp.php"
         data = f"pIdAsoc={self.id_asoc}"
-        async with self._session.post(url, headers=self.headers(), data=data, timeout=20) as resp:
-            txt = await resp.text()
-            if resp.status != 200:
-                raise EBlocAuthError(f"HTTP {resp.status}")
-            if "login" in txt.lower() and "password" in txt.lower():
-                raise EBlocAuthError("Autentificare eșuată (redirect la login)")
+        await self._coalesced(("AjaxGetHomeAp.php", data), lambda: self._discover(data))
+
+    async def _discover(self, data: str) -> None:
+        status, body = await self._send("AjaxGetHomeAp.php", data, "HomeAp")
+        if status != 200:
+            self.session_state = SESSION_UNKNOWN
+            raise EBlocAuthError(f"HTTP {status}")
+        if _is_login_page(body.decode("utf-8", "replace")):
+            self.session_state = SESSION_EXPIRED
+            raise EBlocAuthError("Autentificare eșuată (redirect la login)")
+        self.session_state = SESSION_VALID
+
+    async def ensure_session(self) -> None:
+        """Discover once per session; fail fast without I/O once the cookie is known expired."""
+        if self.session_state == SESSION_VALID:
+            return
+        async with self._discover_lock:
+            if self.session_state == SESSION_EXPIRED:
+                raise EBlocAuthError("Sesiune expirată")
+            if self.session_state != SESSION_VALID:
+                await self.discover()
+
+    async def _post_json(
+        self,
+        endpoint: str,
+        data: str,
+        label: str,
+        only_ap: str | None = None,
+    ) -> Any:
+        return await self._coalesced(
+            (endpoint, data, only_ap or ""),
+            lambda: self._request_json(endpoint, data, label, only_ap),
+        )
+
+    async def _read_body(self, resp: aiohttp.ClientResponse, label: str) -> bytearray:
+        """Read the raw body, refusing anything larger than max_body."""
+        if resp.content_length is not None and resp.content_length > self.max_body:
+            raise EBlocError(f"Răspuns prea mare la {label}: {resp.content_length} octeți")
+        body = bytearray()
+        async for chunk in resp.content.iter_chunked(65536):
+            body += chunk
+            if len(body) > self.max_body:
+                raise EBlocError(f"Răspuns prea mare la {label}: > {self.max_body} octeți")
+        return body
+
+    async def _send(
+        self, endpoint: str, data: str, label: str, idempotent: bool = True
+    ) -> tuple[int, bytearray]:
+        """POST with retries, exponential backoff and the circuit breaker.
+
+        Idempotent requests are retried on timeouts, transport errors and
+        transient HTTP statuses; others only when the connection was never made.
+        """
+        url = f"{self.ajax}/{endpoint}"
+        stats = self.stats.setdefault(endpoint, EndpointStats())
+        for attempt in range(RETRY_ATTEMPTS):
+            self.breaker.before()
+            stats.requests += 1
+            started = time.perf_counter()
+            try:
+                async with self._session.post(
+                    url, headers=self._headers, data=data, timeout=self._timeout
+                ) as resp:
+                    status = resp.status
+                    body = await self._read_body(resp, label)
+            except (TimeoutError, aiohttp.ClientError) as err:
+                stats.observe(time.perf_counter() - started)
+                stats.errors += 1
+                self.breaker.failure()
+                retry = idempotent or isinstance(err, aiohttp.ClientConnectorError)
+                if not retry or attempt == RETRY_ATTEMPTS - 1:
+                    raise EBlocUnavailable(f"{label}: {type(err).__name__} {err}") from err
+            except EBlocError:
+                stats.observe(time.perf_counter() - started)
+                stats.errors += 1
+                raise
+            else:
+                stats.observe(time.perf_counter() - started)
+                stats.bytes_received += len(body)
+                if status not in RETRY_STATUSES:
+                    self.breaker.success()
+                    return status, body
+                stats.errors += 1
+                self.breaker.failure()
+                if not idempotent or attempt == RETRY_ATTEMPTS - 1:
+                    raise EBlocUnavailable(f"HTTP {status} la {label}")
+            delay = RETRY_BACKOFF_BASE * 2**attempt
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+        raise EBlocUnavailable(f"{label}: reîncercări epuizate")
+
+    async def _request_json(
+        self, endpoint: str, data: str, label: str, only_ap: str | None = None
+    ) -> Any:
+        """POST to an ajax endpoint and decode JSON straight from bytes.
+
+        With only_ap, rows of other apartments are discarded while decoding.
+        A body identical to the previous one for the same request returns the
+        previously decoded object itself, so callers can test `is` to skip
+        recomputation; results are shared and must not be mutated.
+        A login page or a non-JSON body invalidates the session; it is
+        re-discovered once before giving up.
+        """
+        stats = self.stats.setdefault(endpoint, EndpointStats())
+        key = (endpoint, data, only_ap or "")
+        for attempt in range(2):
+            await self.ensure_session()
+            _, body = await self._send(endpoint, data, label)
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            cached = self._decoded.get(key)
+            if cached is not None and cached[0] == digest:
+                stats.unchanged += 1
+                return cached[1]
+            started = time.perf_counter()
+            try:
+                if only_ap is None:
+                    result = json.loads(body)
+                else:
+                    result = _filter_rows(
+                        body.decode("utf-8"), lambda r: str(r.get("id_ap", only_ap)) == only_ap
+                    )
+                self._remember(key, digest, result)
+                return result
+            except (ValueError, IndexError) as err:
+                stats.errors += 1
+                _LOGGER.debug("%s raw: %s", label, bytes(body[:200]))
+                if attempt:
+                    raise EBlocError(f"Răspuns invalid la {label}") from err
+            finally:
+                stats.decode_seconds += time.perf_counter() - started
+            # Login page or garbage: the session is suspect, re-discover and retry once
+            self._invalidate_session()
+        raise EBlocError(f"Răspuns invalid la {label}")
+
+    def _remember(self, key: tuple[str, ...], digest: bytes, result: Any) -> None:
+        self._decoded.pop(key, None)
+        if len(self._decoded) >= self.DECODED_CACHE_SIZE:
+            del self._decoded[next(iter(self._decoded))]
+        self._decoded[key] = (digest, result)
 
     async def get_home_info(self) -> dict[str, Any]:
         """AjaxGetHomeApInfo.php -> user & month info."""
-        url = f"{self.AJAX}/AjaxGetHomeApInfo.php"
         if not self.id_asoc or not self.id_ap:
             self._extract_ids_from_cookie()
         data = f"pIdAsoc={self.id_asoc}&pIdAp={self.id_ap or '0'}"
-        async with self._session.post(url, headers=self.headers(), data=data, timeout=30) as resp:
-            raw = await resp.text()
-            try:
-                js = json.loads(raw)
-            except Exception as err:
-                _LOGGER.debug("Home info raw: %s", raw[:200])
-                raise EBlocAuthError("Răspuns invalid la HomeApInfo") from err
-            return js.get("1", js)
+        js = await self._post_json("AjaxGetHomeApInfo.php", data, "HomeApInfo")
+        return js.get("1", js)
 
-    async def get_plati_chitante(self, months: int = 12) -> dict[str, Any]:
-        url = f"{self.AJAX}/AjaxGetPlatiChitante.php"
+    async def get_plati_rows(self) -> list[dict[str, Any]]:
+        """AjaxGetPlatiChitante.php -> every receipt row, unsorted."""
         if not self.id_asoc or not self.id_ap:
             self._extract_ids_from_cookie()
         data = f"pIdAsoc={self.id_asoc}&pIdAp={self.id_ap or '-1'}"
-        async with self._session.post(url, headers=self.headers(), data=data, timeout=30) as resp:
-            raw = await resp.text()
-            try:
-                js = json.loads(raw)
-            except Exception as err:
-                _LOGGER.debug("Plati raw: %s", raw[:200])
-                raise EBlocAuthError("Răspuns invalid la PlatiChitante") from err
-            rows = [v for v in js.values() if isinstance(v, dict)]
-            rows.sort(key=lambda r: r.get("luna", ""), reverse=True)
-            limited = rows[:months] if months else rows
-            return {str(i + 1): r for i, r in enumerate(limited)}
+        js = await self._post_json("AjaxGetPlatiChitante.php", data, "PlatiChitante")
+        return [v for v in js.values() if isinstance(v, dict)]
+
+    async def get_plati_chitante(self, months: int = 12) -> dict[str, Any]:
+        rows = await self.get_plati_rows()
+        rows.sort(key=lambda r: r.get("luna", ""), reverse=True)
+        limited = rows[:months] if months else rows
+        return {str(i + 1): r for i, r in enumerate(limited)}
 
     async def get_index_luni(self) -> dict[str, Any]:
-        url = f"{self.AJAX}/AjaxGetIndexLuni.php"
         if not self.id_asoc:
             self._extract_ids_from_cookie()
         data = f"pIdAsoc={self.id_asoc}"
-        async with self._session.post(url, headers=self.headers(), data=data, timeout=30) as resp:
-            raw = await resp.text()
-            try:
-                js = json.loads(raw)
-            except Exception as err:
-                _LOGGER.debug("Index luni raw: %s", raw[:200])
-                raise EBlocAuthError("Răspuns invalid la IndexLuni") from err
-            return js
-
-    async def get_index_contoare(self, luna: str, pIdAp: str | int = -1) -> dict[str, Any]:
-        url = f"{self.AJAX}/AjaxGetIndexContoare.php"
+        return await self._post_json("AjaxGetIndexLuni.php", data, "IndexLuni")
+
+    async def get_index_contoare(
+        self, luna: str, pIdAp: str | int = -1, only_ap: str | None = None
+    ) -> dict[str, Any]:
+        """Meter readings for one month; only_ap keeps a single apartment's rows."""
         if not self.id_asoc:
             self._extract_ids_from_cookie()
         data = f"pIdAsoc={self.id_asoc}&pLuna={luna}&pIdAp={pIdAp}"
-        async with self._session.post(url, headers=self.headers(), data=data, timeout=30) as resp:
-            raw = await resp.text()
-            try:
-                js = json.loads(raw)
-            except Exception as err:
-                _LOGGER.debug("Index contoare raw: %s", raw[:200])
-                raise EBlocAuthError("Răspuns invalid la IndexContoare") from err
-            return js
+        return await self._post_json("AjaxGetIndexContoare.php", data, "IndexContoare", only_ap)
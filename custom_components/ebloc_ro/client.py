@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.util.ssl import client_context
+
+from .api import CircuitBreaker
+from .const import DOMAIN, HOST_CONNECTION_LIMIT, KEEPALIVE_SECONDS
+
+DATA_SESSION = "session"
+DATA_BREAKER = "breaker"
+
+
+@callback
+def async_get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Dedicated keep-alive session for www.e-bloc.ro, shared by all entries."""
+    data = hass.data.setdefault(DOMAIN, {})
+    session: aiohttp.ClientSession | None = data.get(DATA_SESSION)
+    if session is not None and not session.closed:
+        return session
+
+    connector = aiohttp.TCPConnector(
+        limit_per_host=HOST_CONNECTION_LIMIT,
+        keepalive_timeout=KEEPALIVE_SECONDS,
+        ttl_dns_cache=300,
+        ssl=client_context(),
+    )
+    session = data[DATA_SESSION] = aiohttp.ClientSession(connector=connector)
+
+    async def _close(_event: Event) -> None:
+        await session.close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _close)
+    return session
+
+
+@callback
+def async_get_breaker(hass: HomeAssistant) -> CircuitBreaker:
+    """One circuit breaker per host, so every entry backs off together."""
+    data = hass.data.setdefault(DOMAIN, {})
+    breaker: CircuitBreaker | None = data.get(DATA_BREAKER)
+    if breaker is None:
+        breaker = data[DATA_BREAKER] = CircuitBreaker()
+    return breaker
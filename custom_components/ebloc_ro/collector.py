@@ -0,0 +1,262 @@
+"""Bulk collector: harvest many e-Bloc accounts without Home Assistant.
+
+Only aiohttp and the Home Assistant-free modules of this integration are
+used; run it through scripts/ebloc_collect.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+
+from .api import CircuitBreaker, EBlocAPI, EBlocAuthError
+from .const import DEFAULT_HISTORY_MONTHS, KEEPALIVE_SECONDS
+from .history import available_months, prev_months, reduce_history
+from .ledger import receipt_key
+from .models import HomeInfo
+from .money import bani
+from .sink import RowSink
+
+_LOGGER = logging.getLogger(__name__)
+
+HOME_FIELDS = (
+    "ts",
+    "account",
+    "id_asoc",
+    "id_ap",
+    "cod_client",
+    "ap",
+    "nr_pers_afisat",
+    "datorie_bani",
+    "ultima_zi_plata",
+    "luna_afisata",
+    "nivel_restanta",
+    "contoare_citite",
+)
+PAYMENT_FIELDS = ("account", "id_asoc", "id_ap", "key", "luna", "data", "suma_bani")
+INDEX_FIELDS = ("account", "id_asoc", "id_ap", "luna", "meter", "tip", "index", "data")
+
+
+@dataclass(slots=True)
+class Account:
+    name: str | None
+    cookie: str
+
+
+def read_accounts(path: Path) -> list[Account]:
+    """One account per line: a raw cookie string or {"name": ..., "cookie": ...}."""
+    accounts = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            d = json.loads(line)
+            accounts.append(Account(d.get("name"), d["cookie"]))
+        else:
+            accounts.append(Account(None, line))
+    return accounts
+
+
+@dataclass(slots=True)
+class Sinks:
+    home: RowSink
+    payments: RowSink
+    indices: RowSink
+
+    @classmethod
+    def in_dir(cls, out: Path, fmt: str) -> Sinks:
+        return cls(
+            RowSink(out / f"home.{fmt}", HOME_FIELDS, fmt),
+            RowSink(out / f"payments.{fmt}", PAYMENT_FIELDS, fmt),
+            RowSink(out / f"indices.{fmt}", INDEX_FIELDS, fmt),
+        )
+
+    def __iter__(self) -> Iterator[RowSink]:
+        return iter((self.home, self.payments, self.indices))
+
+
+@dataclass(slots=True)
+class ResumeState:
+    """What earlier runs already wrote, per account."""
+
+    last_month: dict[str, str]
+    receipts: dict[str, set[str]]
+    # Latest index written per meter for each account's last month, which is
+    # fetched again on every run because its readings can still change
+    last_rows: dict[str, dict[str, str]]
+
+    @classmethod
+    def from_sinks(cls, sinks: Sinks) -> ResumeState:
+        state = cls({}, {}, {})
+        for row in sinks.indices.rows():
+            state.add_index(str(row["account"]), str(row["luna"]), row["meter"], row["index"])
+        for row in sinks.payments.rows():
+            state.receipts.setdefault(str(row["account"]), set()).add(str(row["key"]))
+        return state
+
+    def add_index(self, account: str, luna: str, meter: Any, index: Any) -> bool:
+        """Record an index row; False when it is already in the output."""
+        last = self.last_month.get(account, "")
+        if luna < last:
+            return True
+        if luna > last:
+            self.last_month[account] = luna
+            self.last_rows[account] = {}
+        rows = self.last_rows[account]
+        if rows.get(str(meter)) == str(index):
+            return False
+        rows[str(meter)] = str(index)
+        return True
+
+
+async def harvest(
+    api: EBlocAPI, account: str, months: int, state: ResumeState, sinks: Sinks
+) -> None:
+    """Fetch one account and append what earlier runs did not write yet."""
+    ids = {"account": account, "id_asoc": api.id_asoc, "id_ap": api.id_ap}
+    home = await api.get_home_info()
+    info = HomeInfo.from_raw(home)
+    sinks.home.write(
+        {
+            "ts": int(time.time()),
+            **ids,
+            "cod_client": info.cod_client,
+            "ap": info.ap,
+            "nr_pers_afisat": info.nr_pers_afisat,
+            "datorie_bani": info.datorie_bani,
+            "ultima_zi_plata": info.ultima_zi_plata,
+            "luna_afisata": info.luna_afisata,
+            "nivel_restanta": info.nivel_restanta,
+            "contoare_citite": info.contoare_citite,
+        }
+    )
+
+    # Months newer than the last one in the output, plus that month itself (its
+    # readings may have changed since), and only those with readings
+    luna = info.luna_afisata or time.strftime("%Y-%m")
+    last = state.last_month.get(account, "")
+    window = [ym for ym in prev_months(luna, months) if ym >= last]
+    try:
+        listed = available_months(await api.get_index_luni())
+    except EBlocAuthError:
+        raise
+    except Exception as err:  # noqa: BLE001
+        _LOGGER.debug("%s: index luni: %s", account, err)
+        listed = set()
+    if listed:
+        window = [ym for ym in window if ym in listed or ym == luna]
+    fetched = await asyncio.gather(
+        *(api.get_index_contoare(luna=ym, pIdAp=api.id_ap or -1) for ym in window),
+        return_exceptions=True,
+    )
+    results = {}
+    for ym, js in zip(window, fetched, strict=True):
+        if isinstance(js, EBlocAuthError):
+            raise js
+        if isinstance(js, BaseException):
+            _LOGGER.debug("%s: index contoare %s skipped: %s", account, ym, js)
+            continue
+        results[ym] = js
+    meters, _, _ = reduce_history(results, window, api.id_ap)
+    for ym in sorted(meters):
+        for meter, m in meters[ym].items():
+            # A changed reading is appended; the last row per (luna, meter) wins
+            if state.add_index(account, ym, meter, m["index"]):
+                sinks.indices.write({**ids, "luna": ym, "meter": meter, **m})
+
+    seen = state.receipts.setdefault(account, set())
+    for row in sorted(await api.get_plati_rows(), key=lambda r: str(r.get("luna", ""))):
+        key = receipt_key(row)
+        if key in seen:
+            continue
+        seen.add(key)
+        sinks.payments.write(
+            {
+                **ids,
+                "key": key,
+                "luna": row.get("luna"),
+                "data": row.get("data"),
+                "suma_bani": bani(row.get("suma")),
+            }
+        )
+
+
+async def collect(args: argparse.Namespace) -> int:
+    accounts = read_accounts(args.accounts)
+    args.output.mkdir(parents=True, exist_ok=True)
+    sinks = Sinks.in_dir(args.output, args.format)
+    state = ResumeState.from_sinks(sinks)
+    for sink in sinks:
+        sink.open()
+
+    connector = aiohttp.TCPConnector(
+        limit_per_host=args.per_host, keepalive_timeout=KEEPALIVE_SECONDS, ttl_dns_cache=300
+    )
+    breaker = CircuitBreaker()
+    sem = asyncio.Semaphore(args.parallel)
+    failed = 0
+    started = time.perf_counter()
+
+    async def _one(acc: Account) -> None:
+        nonlocal failed
+        api = EBlocAPI(session, acc.cookie, breaker=breaker, base_url=args.base_url)
+        api._extract_ids_from_cookie()
+        name = acc.name or f"{api.id_asoc}_{api.id_ap or 'all'}"
+        async with sem:
+            try:
+                await harvest(api, name, args.months, state, sinks)
+            except Exception as err:  # noqa: BLE001
+                failed += 1
+                _LOGGER.warning("%s: %s: %s", name, type(err).__name__, err)
+
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await asyncio.gather(*(_one(acc) for acc in accounts))
+    finally:
+        for sink in sinks:
+            sink.close()
+    _LOGGER.info(
+        "%d accounts (%d failed) in %.1fs: %d home, %d payment, %d index rows",
+        len(accounts),
+        failed,
+        time.perf_counter() - started,
+        sinks.home.written,
+        sinks.payments.written,
+        sinks.indices.written,
+    )
+    return 1 if failed else 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="ebloc_collect",
+        description="Harvest home info, payments and meter indices for many e-Bloc accounts.",
+    )
+    parser.add_argument(
+        "accounts", type=Path, help='file with one cookie or {"name", "cookie"} JSON per line'
+    )
+    parser.add_argument("-o", "--output", type=Path, default=Path("."), help="output directory")
+    parser.add_argument("-f", "--format", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument("-m", "--months", type=int, default=DEFAULT_HISTORY_MONTHS)
+    parser.add_argument("--parallel", type=int, default=32, help="accounts fetched at once")
+    parser.add_argument("--per-host", type=int, default=16, help="connections to e-bloc.ro")
+    parser.add_argument("--base-url", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+        stream=sys.stderr,
+    )
+    return asyncio.run(collect(args))
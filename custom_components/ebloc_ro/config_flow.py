@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from collections.abc import Mapping
+from typing import Any
+
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.data_entry_flow import FlowResult
@@ -7,15 +10,25 @@ from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .api import EBlocAPI, EBlocAuthError
 from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_BACKFILL_RPM,
     CONF_COOKIE,
     CONF_HISTORY_MONTHS,
+    CONF_MAX_CONCURRENCY,
     CONF_SCAN_INTERVAL_MIN,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_BACKFILL_RPM,
     DEFAULT_HISTORY_MONTHS,
+    DEFAULT_MAX_CONCURRENCY,
     DEFAULT_SCAN_INTERVAL_MIN,
     DOMAIN,
 )
 
 
+def _unique_id(api: EBlocAPI) -> str:
+    return f"ebloc_ro_{api.id_asoc}_{api.id_ap or 'all'}"
+
+
 class EBlocConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
@@ -34,7 +47,7 @@ class EBlocConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             except Exception:
                 errors["base"] = "unknown"
             else:
-                await self.async_set_unique_id(f"ebloc_ro_{api.id_asoc}_{api.id_ap or 'all'}")
+                await self.async_set_unique_id(_unique_id(api))
                 self._abort_if_unique_id_configured()
                 return self.async_create_entry(
                     title="e-Bloc Romania",
@@ -56,6 +69,37 @@ class EBlocConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
         return self.async_show_form(step_id="user", data_schema=data_schema, errors=errors)
 
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input: dict | None = None) -> FlowResult:
+        errors: dict[str, str] = {}
+        entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        if user_input is not None and entry is not None:
+            cookie = (user_input.get(CONF_COOKIE) or "").strip()
+            try:
+                api = EBlocAPI(async_get_clientsession(self.hass), cookie)
+                await api.discover()
+            except EBlocAuthError:
+                errors["base"] = "auth"
+            except Exception:
+                errors["base"] = "unknown"
+            else:
+                # A valid cookie for another apartment would silently swap the entry's data
+                if entry.unique_id and entry.unique_id != _unique_id(api):
+                    return self.async_abort(reason="reauth_account_mismatch")
+                self.hass.config_entries.async_update_entry(
+                    entry, data={**entry.data, CONF_COOKIE: cookie}
+                )
+                await self.hass.config_entries.async_reload(entry.entry_id)
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({vol.Required(CONF_COOKIE): str}),
+            errors=errors,
+        )
+
 
 class EBlocOptionsFlow(config_entries.OptionsFlow):
     def __init__(self, entry: config_entries.ConfigEntry) -> None:
@@ -76,6 +120,18 @@ class EBlocOptionsFlow(config_entries.OptionsFlow):
                     CONF_HISTORY_MONTHS,
                     default=data.get(CONF_HISTORY_MONTHS, DEFAULT_HISTORY_MONTHS),
                 ): vol.All(int, vol.Range(min=1, max=120)),
+                vol.Optional(
+                    CONF_MAX_CONCURRENCY,
+                    default=data.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+                ): vol.All(int, vol.Range(min=1, max=16)),
+                vol.Optional(
+                    CONF_BACKFILL_RPM,
+                    default=data.get(CONF_BACKFILL_RPM, DEFAULT_BACKFILL_RPM),
+                ): vol.All(int, vol.Range(min=1, max=60)),
+                vol.Optional(
+                    CONF_ADAPTIVE_POLLING,
+                    default=data.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+                ): bool,
             }
         )
         return self.async_show_form(step_id="init", data_schema=schema)
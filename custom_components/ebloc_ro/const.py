@@ -3,9 +3,54 @@ DOMAIN = "ebloc_ro"
 CONF_COOKIE = "cookie"
 CONF_SCAN_INTERVAL_MIN = "scan_interval_min"
 CONF_HISTORY_MONTHS = "history_months"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_BACKFILL_RPM = "backfill_rpm"
 
 DEFAULT_SCAN_INTERVAL_MIN = 60
 DEFAULT_HISTORY_MONTHS = 12
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_ADAPTIVE_POLLING = True
+# Older months are backfilled in the background at this many requests per minute
+DEFAULT_BACKFILL_RPM = 6
+# A month that failed to backfill waits this long, doubled after every further failure
+BACKFILL_RETRY_HOURS = 6
+
+STORAGE_VERSION = 1
+CACHE_MAX_MONTHS = 240
+# Closed months never change, so they are evicted by how old the month is, not by when
+# it was fetched: nothing older than the longest history window is ever read again
+CACHE_MAX_MONTH_AGE = 120
+PLATI_MAX_AGE_HOURS = 24
+# AjaxGetIndexLuni only grows when the displayed month changes
+INDEX_LUNI_MAX_AGE_HOURS = 24
+# Shared association-wide readings are reused at most this long, whatever the poll interval
+HUB_CONTOARE_MAX_AGE_MINUTES = 60
+
+# Guard against pathological responses ballooning memory
+MAX_RESPONSE_BYTES = 8 * 1024 * 1024
+
+# HTTP client tuning for www.e-bloc.ro
+HOST_CONNECTION_LIMIT = 4
+KEEPALIVE_SECONDS = 60
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 1.0
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_OPEN_SECONDS = 300
+
+# Per-stage refresh timeouts (seconds); payments run alongside home -> index
+STAGE_TIMEOUT_HOME = 60
+STAGE_TIMEOUT_INDEX = 180
+STAGE_TIMEOUT_PLATI = 90
+
+# Index history reduction: NumPy selection and executor offload thresholds (rows)
+REDUCE_NUMPY_ROWS = 256
+REDUCE_EXECUTOR_ROWS = 2000
+
+SERVICE_INVALIDATE_CACHE = "invalidate_cache"
+SERVICE_EXPORT_HISTORY = "export_history"
 
 ATTRIBUTION = "Date furnizate de e-Bloc.ro"
 INTEGRATION_VERSION = "1.0.3"
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from .models import MonthIndex
+
+# A drop is read as a counter wrap only when the previous index was in the top and
+# the new one in the bottom share of the meter's register
+_ROLLOVER_EDGE_SHARE = 0.1
+
+
+@dataclass(slots=True)
+class MeterConsumption:
+    tip: str
+    luna: str
+    index: int
+    total: float = 0.0
+    delta: float = 0.0
+    # Reading before `luna`, so a revised current month can be recomputed
+    prev_index: int | None = None
+    # Register width in digits; e-Bloc does not report it, so it is unknown unless set
+    digits: int | None = None
+
+
+def _delta(prev: int, new: int, digits: int | None = None) -> float:
+    if new >= prev:
+        return float(new - prev)
+    if digits:
+        ceiling = 10**digits
+        edge = ceiling * _ROLLOVER_EDGE_SHARE
+        if prev >= ceiling - edge and new < edge:
+            return float(new + ceiling - prev)
+    # Correction or meter replaced: the lower reading becomes the baseline
+    return 0.0
+
+
+class ConsumptionTracker:
+    """Per-meter running consumption built from month-over-month index deltas.
+
+    Only months newer than the last one seen are processed; a revised reading
+    for the last month replaces its delta instead of being added twice.
+    """
+
+    def __init__(self) -> None:
+        self.meters: dict[str, MeterConsumption] = {}
+
+    def update(self, months: tuple[MonthIndex, ...]) -> bool:
+        changed = False
+        for month in sorted(months, key=lambda m: m.luna):
+            for reading in month.meters:
+                state = self.meters.get(reading.meter)
+                if state is None:
+                    self.meters[reading.meter] = MeterConsumption(
+                        tip=reading.tip, luna=month.luna, index=reading.index
+                    )
+                    changed = True
+                elif month.luna > state.luna:
+                    delta = _delta(state.index, reading.index, state.digits)
+                    state.prev_index = state.index
+                    state.luna, state.index, state.delta = month.luna, reading.index, delta
+                    state.total += delta
+                    changed = True
+                elif month.luna == state.luna and reading.index != state.index:
+                    delta = 0.0
+                    if state.prev_index is not None:
+                        delta = _delta(state.prev_index, reading.index, state.digits)
+                    state.total += delta - state.delta
+                    state.index, state.delta = reading.index, delta
+                    changed = True
+        return changed
+
+    def clear(self) -> None:
+        self.meters.clear()
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        return {meter: asdict(state) for meter, state in self.meters.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, dict[str, Any]]) -> ConsumptionTracker:
+        tracker = cls()
+        for meter, state in data.items():
+            try:
+                tracker.meters[meter] = MeterConsumption(**state)
+            except TypeError:
+                continue
+        return tracker
@@ -2,32 +2,113 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
+import os
+import time
+from collections.abc import Awaitable
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import TypeVar
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .api import EBlocAPI, EBlocAuthError
+from .client import async_get_breaker, async_get_session
 from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_BACKFILL_RPM,
     CONF_COOKIE,
     CONF_HISTORY_MONTHS,
+    CONF_MAX_CONCURRENCY,
     CONF_SCAN_INTERVAL_MIN,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_BACKFILL_RPM,
     DEFAULT_HISTORY_MONTHS,
+    DEFAULT_MAX_CONCURRENCY,
     DEFAULT_SCAN_INTERVAL_MIN,
+    HUB_CONTOARE_MAX_AGE_MINUTES,
+    INDEX_LUNI_MAX_AGE_HOURS,
+    REDUCE_EXECUTOR_ROWS,
+    STAGE_TIMEOUT_HOME,
+    STAGE_TIMEOUT_INDEX,
+    STAGE_TIMEOUT_PLATI,
 )
+from .history import available_months, month_range, prev_months, reduce_history, row_count
+from .hub import acquire_hub
+from .models import EBlocSnapshot
+from .money import amount_cents
+from .scheduler import failure_interval, next_interval
+from .sink import RowSink
+from .statistics import EBlocStatistics
+from .store import EBlocCache
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
 
-class EBlocCoordinator(DataUpdateCoordinator):
+EXPORT_FIELDS = (
+    "kind",
+    "id_asoc",
+    "id_ap",
+    "luna",
+    "meter",
+    "tip",
+    "index",
+    "data",
+    "key",
+    "suma_bani",
+)
+# Payment rows handed to the executor per write
+EXPORT_CHUNK = 500
+
+# Snapshot fields each entity-facing section is built from
+SECTIONS: dict[str, tuple[str, ...]] = {
+    "home": ("home",),
+    "index": ("months", "latest_index", "luna"),
+    "plati": ("payments",),
+}
+
+
+def _plati_fingerprint(home: dict) -> str:
+    return "|".join(str(home.get(k, "")) for k in ("luna_afisata", "datorie", "ultima_zi_plata"))
+
+
+def _changed_sections(old: EBlocSnapshot | None, new: EBlocSnapshot) -> set[str]:
+    if old is None:
+        return set(SECTIONS)
+    return {
+        section
+        for section, keys in SECTIONS.items()
+        if any(getattr(old, k) != getattr(new, k) for k in keys)
+    }
+
+
+def _rows_for_ap(idx, id_ap: str | None):
+    """Keep only the rows of id_ap from an association-wide payload."""
+    if not id_ap or not isinstance(idx, dict):
+        return idx
+    return {
+        k: r
+        for k, r in idx.items()
+        if not isinstance(r, dict) or str(r.get("id_ap", id_ap)) == str(id_ap)
+    }
+
+
+class EBlocCoordinator(DataUpdateCoordinator[EBlocSnapshot]):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
         self.hass = hass
         self.entry = entry
-        session = async_get_clientsession(hass)
+        session = async_get_session(hass)
         cookie = entry.data.get(CONF_COOKIE, "")
-        self.api = EBlocAPI(session, cookie)
+        self.api = EBlocAPI(session, cookie, breaker=async_get_breaker(hass))
+        self.cache = EBlocCache(hass, entry.entry_id)
+        self.api._extract_ids_from_cookie()
+        self.hub = acquire_hub(hass, entry.entry_id, self.api)
+        self.statistics = EBlocStatistics(hass, self.api.id_asoc, self.api.id_ap)
+        self._statistics_synced = False
 
         scan_min = entry.options.get(
             CONF_SCAN_INTERVAL_MIN,
@@ -38,94 +119,532 @@ class EBlocCoordinator(DataUpdateCoordinator):
             _LOGGER,
             name="e-Bloc Romania",
             update_interval=timedelta(minutes=int(scan_min)),
+            always_update=False,
+        )
+        self._fast_interval = timedelta(minutes=int(scan_min))
+        self._failures = 0
+        self.adaptive_polling = bool(
+            entry.options.get(
+                CONF_ADAPTIVE_POLLING,
+                entry.data.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+            )
         )
+        # True while data is the restored snapshot and no refresh has succeeded yet
+        self.restored = False
+        self.last_refresh_seconds: float | None = None
+        self.last_refresh_requests: int | None = None
+        self.month_cache_hits = 0
+        self.month_cache_misses = 0
+        self.months_skipped = 0
+        self.stage_seconds: dict[str, float] = {}
+        self.stage_failures: dict[str, int] = {}
+        self.available_months: set[str] | None = None
+        self._available_for: str | None = None
+        # Sections that differ from the previous snapshot; entities skip writes otherwise
+        self.changed_sections: set[str] = set(SECTIONS)
 
         self.history_months = int(
             entry.options.get(
                 CONF_HISTORY_MONTHS, entry.data.get(CONF_HISTORY_MONTHS, DEFAULT_HISTORY_MONTHS)
             )
         )
+        self.max_concurrency = max(
+            1,
+            int(
+                entry.options.get(
+                    CONF_MAX_CONCURRENCY,
+                    entry.data.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+                )
+            ),
+        )
+        self.backfill_rpm = max(
+            1,
+            int(
+                entry.options.get(
+                    CONF_BACKFILL_RPM, entry.data.get(CONF_BACKFILL_RPM, DEFAULT_BACKFILL_RPM)
+                )
+            ),
+        )
+        # Older months still to fetch, newest first; drained by _async_backfill
+        self._backlog: list[str] = []
+        self._backfill_task: asyncio.Task | None = None
+        self.backfilled_months = 0
+        self.backfill_deferred = 0
+        # Inputs of the last snapshot, compared by identity to skip unchanged work
+        self._inputs: tuple = (None, None, None)
+        self._last_index: tuple[list[str], dict, tuple] | None = None
+        self._shared_rows: dict[str, tuple[dict, dict]] = {}
+        self._plati_view: dict | None = None
+        self.reduce_skipped = 0
+        self.snapshot_reused = 0
 
-    async def _async_update_data(self):
-        try:
-            await self.api.discover()
-            home = await self.api.get_home_info()
-            luna = home.get("luna_afisata") or datetime.utcnow().strftime("%Y-%m")
-            await self.api.get_index_contoare(luna=luna, pIdAp="-1")
-            # Build index history for configured months
-            from datetime import datetime as _dt
-
-            def _prev_months(start_ym: str, count: int):
-                y, m = (int(x) for x in start_ym.split("-")[:2])
-                res = []
-                for i in range(count):
-                    yy, mm = y, m - i
-                    while mm <= 0:
-                        yy -= 1
-                        mm += 12
-                    res.append(f"{yy:04d}-{mm:02d}")
-                return res
-
-            months = _prev_months(luna, max(1, int(self.history_months)))
-            index_history = {}
-            latest_index = None
-            latest_date = None
-            for ym in months:
+    async def async_load_cache(self) -> None:
+        """Load the disk cache and seed data with the last good snapshot, if any."""
+        await self.cache.async_load()
+        if self.cache.snapshot and self.data is None:
+            try:
+                self.data = EBlocSnapshot.from_dict(self.cache.snapshot)
+                self.restored = True
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.debug("Cached snapshot ignored: %s", err)
+
+    async def async_shutdown(self) -> None:
+        await super().async_shutdown()
+        self.api.cancel_inflight()
+
+    async def async_invalidate_cache(self) -> None:
+        await self.cache.async_invalidate()
+        self.api.clear_coalesce_cache()
+        self.hub.invalidate()
+        self._plati_view = None
+        await self.async_request_refresh()
+
+    async def _fetch_months(self, months: list[str]) -> dict[str, dict]:
+        """Fetch AjaxGetIndexContoare for all months, at most max_concurrency at a time.
+
+        Failed months are soft-skipped and left out of the result.
+        """
+        sem = asyncio.BoundedSemaphore(self.max_concurrency)
+
+        async def _one(ym: str) -> dict | None:
+            async with sem:
                 try:
-                    idx = await self.api.get_index_contoare(luna=ym, pIdAp="-1")
+                    return await self._fetch_month(ym)
                 except asyncio.CancelledError:
-                    idx = {}  # soft-skip month on cancellation
-                except Exception:
-                    idx = {}
-
-                month_val = None
-                month_date = None
-                if isinstance(idx, dict):
-                    for row in idx.values():
-                        if isinstance(row, dict):
-                            try:
-                                val = int(str(row.get("index_nou", "0")).strip() or 0)
-                            except Exception:
-                                val = None
-                            dstr = row.get("data")
-                            try:
-                                dt = _dt.strptime(dstr, "%Y-%m-%d") if dstr else None
-                            except Exception:
-                                dt = None
-                            if val is not None:
-                                if month_date is None and month_val is None:
-                                    month_val, month_date = val, dt
-                                else:
-                                    if dt and (month_date is None or dt > month_date):
-                                        month_val, month_date = val, dt
-                                    elif month_date is None and (
-                                        month_val is None
-                                        or (isinstance(val, int) and val > month_val)
-                                    ):
-                                        month_val = val
-                if month_val is not None:
-                    index_history[ym] = month_val
-                    if latest_date is None and latest_index is None:
-                        latest_index, latest_date = month_val, month_date
-                    else:
-                        if month_date and (latest_date is None or month_date > latest_date):
-                            latest_index, latest_date = month_val, month_date
-                        elif latest_date is None and (
-                            latest_index is None
-                            or (isinstance(month_val, int) and month_val > latest_index)
-                        ):
-                            latest_index = month_val
-
-            plati = await self.api.get_plati_chitante(months=self.history_months)
-
-            return {
+                    return None  # soft-skip month on cancellation
+                except Exception as err:  # noqa: BLE001
+                    _LOGGER.debug("Index contoare %s skipped: %s", ym, err)
+                    return None
+
+        results = await asyncio.gather(*(_one(ym) for ym in months))
+        return {ym: js for ym, js in zip(months, results, strict=True) if js is not None}
+
+    async def _fetch_month(self, ym: str) -> dict:
+        """Fetch one month of meter readings for this apartment.
+
+        Uses the shared association payload when another entry of the same
+        id_asoc fetches it anyway, otherwise only this apartment's rows;
+        pIdAp=-1 is the last resort.
+        """
+        id_ap = self.api.id_ap
+        if self.hub.shares_contoare:
+            # Slightly less than one interval so our own next poll is never served stale
+            # data, and never hours old when adaptive polling stretches the interval
+            max_age = min(
+                self.update_interval.total_seconds() * 0.9, HUB_CONTOARE_MAX_AGE_MINUTES * 60
+            )
+            try:
+                return self._filtered(ym, await self.hub.async_index_contoare(ym, max_age))
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.debug("Shared index contoare %s: %s", ym, err)
+        if id_ap:
+            try:
+                return await self.api.get_index_contoare(luna=ym, pIdAp=id_ap)
+            except EBlocAuthError:
+                raise
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.debug("Index contoare %s for ap %s: %s", ym, id_ap, err)
+        return await self.api.get_index_contoare(luna=ym, pIdAp="-1", only_ap=id_ap)
+
+    async def _available(self, luna: str) -> set[str] | None:
+        """Months that have readings according to AjaxGetIndexLuni.
+
+        The list is reused for a day and refetched when the displayed month
+        changes; None means unknown and every month in the window is requested.
+        """
+        max_age = INDEX_LUNI_MAX_AGE_HOURS * 3600 if luna == self._available_for else 0
+        try:
+            months = available_months(await self.hub.async_index_luni(max_age))
+        except EBlocAuthError:
+            raise
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.debug("Index luni: %s", err)
+            return self.available_months
+        self._available_for = luna
+        self.available_months = months or None
+        return self.available_months
+
+    def _filtered(self, ym: str, shared: dict) -> dict:
+        """This apartment's rows of a shared payload, reused while the payload is unchanged."""
+        hit = self._shared_rows.get(ym)
+        if hit is not None and hit[0] is shared:
+            return hit[1]
+        rows = _rows_for_ap(shared, self.api.id_ap)
+        self._shared_rows[ym] = (shared, rows)
+        return rows
+
+    async def _index_months(
+        self, months: list[str], available: set[str] | None = None
+    ) -> dict[str, dict]:
+        """Serve closed months from cache; always revalidate the current and previous month.
+
+        Months missing from `available` are not requested, except the displayed one.
+        Older months that are not cached yet are left to the background backfill.
+        """
+        id_asoc, id_ap = self.api.id_asoc, self.api.id_ap
+        found: dict[str, dict] = {}
+        missing: list[str] = []
+        backlog: list[str] = []
+        for pos, ym in enumerate(months):
+            hit = None if pos < 2 else self.cache.get_month(id_asoc, id_ap, ym)
+            if hit is not None:
+                found[ym] = hit
+            elif pos and available is not None and ym not in available:
+                self.months_skipped += 1
+            elif pos < 2:
+                missing.append(ym)
+            elif self.cache.miss_pending(id_asoc, id_ap, ym):
+                self.backfill_deferred += 1
+            else:
+                backlog.append(ym)
+        self.month_cache_hits += len(found)
+        self.month_cache_misses += len(missing) + len(backlog)
+        fetched = await self._fetch_months(missing)
+        for ym, js in fetched.items():
+            self.cache.set_month(id_asoc, id_ap, ym, js)
+        found.update(fetched)
+        self._backlog = backlog
+        if backlog and (self._backfill_task is None or self._backfill_task.done()):
+            self._backfill_task = self.entry.async_create_background_task(
+                self.hass, self._async_backfill(), f"{self.name} history backfill"
+            )
+        return found
+
+    async def _async_backfill(self) -> None:
+        """Fetch older months newest first within backfill_rpm, publishing as they land.
+
+        Fetched months, empty ones included, are stored in the month cache, so
+        after a restart only the months that are still missing are queued again.
+        A month that fails is noted in the cache and skipped by later refreshes
+        until BACKFILL_RETRY_HOURS (doubled after each failure) have passed.
+        """
+        id_asoc, id_ap = self.api.id_asoc, self.api.id_ap
+        added = False
+        while self._backlog:
+            ym = self._backlog.pop(0)
+            if self.cache.get_month(id_asoc, id_ap, ym) is not None:
+                continue
+            requests_before = self.api.request_count
+            try:
+                js = await self._fetch_month(ym)
+            except EBlocAuthError:
+                self._backlog = []
+                return
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.debug("Backfill %s skipped: %s", ym, err)
+                # Not queued again until its retry delay has passed
+                self.cache.note_miss(id_asoc, id_ap, ym)
+                self.cache.schedule_save()
+            else:
+                # An empty month is cached as such, so it is not asked for again
+                self.cache.set_month(id_asoc, id_ap, ym, js or {})
+                self.cache.schedule_save()
+                self.backfilled_months += 1
+                added = True
+                await self._publish_index()
+            used = max(1, self.api.request_count - requests_before)
+            await asyncio.sleep(used * 60 / self.backfill_rpm)
+        if added and self.data is not None:
+            # Backfilled months are older than what statistics already hold
+            await self.statistics.async_update(self.data, self.cache.ledger.as_list(), full=True)
+
+    async def _publish_index(self) -> None:
+        """Rebuild the index history from the month cache and push it to entities."""
+        if self.data is None:
+            return
+        id_asoc, id_ap = self.api.id_asoc, self.api.id_ap
+        months = prev_months(self.data.luna, max(1, int(self.history_months)))
+        results = {
+            ym: js for ym in months if (js := self.cache.get_month(id_asoc, id_ap, ym)) is not None
+        }
+        base = self.data
+        reduced = await self._reduce(results, months)
+        if self.data is not base:
+            return  # a refresh published newer data meanwhile
+        data = base.to_dict()
+        data["meters"], data["index_history"], data["latest_index"] = reduced
+        snapshot = self._commit(data)
+        if self.changed_sections:
+            self.data = snapshot
+            self.async_update_listeners()
+
+    async def _stage(self, name: str, timeout: float, coro: Awaitable[_T]) -> _T:
+        """Run one refresh stage under its own timeout, recording how long it took."""
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                return await coro
+        finally:
+            self.stage_seconds[name] = round(time.perf_counter() - started, 3)
+
+    def _stage_failed(self, name: str, err: BaseException) -> None:
+        self.stage_failures[name] = self.stage_failures.get(name, 0) + 1
+        _LOGGER.warning("e-Bloc %s stage failed, keeping previous data: %r", name, err)
+
+    async def _index(self, luna: str) -> tuple[dict, dict, int | None]:
+        """Index history for the configured window ending at the displayed month."""
+        months = prev_months(luna, max(1, int(self.history_months)))
+        results = await self._index_months(months, await self._available(luna))
+        last = self._last_index
+        if (
+            last is not None
+            and last[0] == months
+            and last[1].keys() == results.keys()
+            and all(results[ym] is last[1][ym] for ym in results)
+        ):
+            # Every payload is the very object decoded last time: nothing to recompute
+            self.reduce_skipped += 1
+            return last[2]
+        reduced = await self._reduce(results, months)
+        self._last_index = (months, results, reduced)
+        return reduced
+
+    async def _reduce(
+        self, results: dict[str, dict], months: list[str]
+    ) -> tuple[dict, dict, int | None]:
+        id_ap = self.api.id_ap
+        if row_count(results) > REDUCE_EXECUTOR_ROWS:
+            return await self.hass.async_add_executor_job(reduce_history, results, months, id_ap)
+        return reduce_history(results, months, id_ap)
+
+    async def _sync_ledger(self) -> None:
+        rows = await self.api.get_plati_rows()
+        if self.cache.ledger.merge(rows):
+            self.cache.schedule_save()
+            self._plati_view = None
+
+    def _plati_rows(self) -> dict:
+        if self._plati_view is None:
+            top = self.cache.ledger.top(self.history_months)
+            self._plati_view = {str(i + 1): row for i, row in enumerate(top)}
+        return self._plati_view
+
+    async def _plati(self, home_task: Awaitable[dict]) -> dict:
+        """Merge new receipts into the ledger until home info changes or a day passes.
+
+        Starts together with home info: the previous snapshot's fingerprint
+        decides whether to fetch right away, the fresh one only adds a fetch
+        when home info changed and the ledger was not already refreshed.
+        """
+        fetched = False
+        if not self.cache.plati_fresh(_plati_fingerprint(self.data.home.raw if self.data else {})):
+            await self._sync_ledger()
+            fetched = True
+        fp = _plati_fingerprint(await home_task)
+        if not fetched and not self.cache.plati_fresh(fp):
+            await self._sync_ledger()
+            fetched = True
+        if fetched:
+            self.cache.mark_plati(fp)
+        return self._plati_rows()
+
+    async def _async_update_data(self) -> EBlocSnapshot:
+        started = time.perf_counter()
+        requests_before = self.api.request_count
+        try:
+            return await self._async_refresh_snapshot()
+        finally:
+            self.last_refresh_seconds = round(time.perf_counter() - started, 3)
+            self.last_refresh_requests = self.api.request_count - requests_before
+
+    async def _async_refresh_snapshot(self) -> EBlocSnapshot:
+        self.changed_sections = set()
+        # home -> index is the only dependency; payments run from the start
+        home_task = asyncio.create_task(
+            self._stage("home", STAGE_TIMEOUT_HOME, self.api.get_home_info())
+        )
+        plati_task = asyncio.create_task(
+            self._stage("plati", STAGE_TIMEOUT_PLATI, self._plati(home_task))
+        )
+        try:
+            home = await home_task
+            luna = home.get("luna_afisata") or datetime.utcnow().strftime("%Y-%m")
+            try:
+                index = await self._stage("index", STAGE_TIMEOUT_INDEX, self._index(luna))
+            except EBlocAuthError:
+                raise
+            except Exception as err:  # noqa: BLE001
+                if self.data is None:
+                    raise
+                self._stage_failed("index", err)
+                prev = self.data.to_dict()
+                index = (prev["meters"], prev["index_history"], prev["latest_index"])
+            try:
+                plati = await plati_task
+            except EBlocAuthError:
+                raise
+            except Exception as err:  # noqa: BLE001
+                self._stage_failed("plati", err)
+                plati = self._plati_rows()
+
+            self._failures = 0
+            self.restored = False
+            if self.adaptive_polling:
+                self.update_interval = next_interval(home, dt_util.now(), self._fast_interval)
+            inputs = (home, index, plati)
+            if self.data is not None and all(
+                a is b for a, b in zip(inputs, self._inputs, strict=True)
+            ):
+                # Same decoded objects as last time: the snapshot cannot have changed
+                self.snapshot_reused += 1
+                return self.data
+            self._inputs = inputs
+            meters, index_history, latest_index = index
+            data = {
                 "home": home,
+                "datorie_bani": amount_cents(home.get("datorie", "0")),
                 "index_history": index_history,
                 "latest_index": latest_index,
+                "meters": meters,
                 "plati": plati,
                 "luna": luna,
             }
+            return self._commit(data)
         except EBlocAuthError as err:
-            raise UpdateFailed(f"Auth error: {err}") from err
+            self._backoff()
+            raise ConfigEntryAuthFailed(f"Auth error: {err}") from err
         except Exception as err:  # noqa: BLE001
-            raise UpdateFailed(str(err)) from err
+            self._backoff()
+            raise UpdateFailed(f"{type(err).__name__}: {err}") from err
+        finally:
+            for task in (home_task, plati_task):
+                if not task.done():
+                    task.cancel()
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def async_export_history(
+        self, target: Path, start: date | None, end: date | None, fmt: str
+    ) -> dict:
+        """Stream per-meter indices and receipts between start and end into target.
+
+        Months come from the month cache when present, otherwise they are
+        fetched max_concurrency at a time; each batch is written and dropped
+        before the next one. File I/O runs in the executor and the file is
+        moved into place only once complete.
+        """
+        id_asoc, id_ap = self.api.id_asoc, self.api.id_ap
+        last = end.strftime("%Y-%m") if end else (self.data.luna if self.data else None)
+        last = last or dt_util.now().strftime("%Y-%m")
+        # Same cached month list the refreshes use
+        available = await self._available(self.data.luna if self.data else last)
+        if start:
+            first = start.strftime("%Y-%m")
+        elif available:
+            first = min(available)
+        else:
+            first = prev_months(last, max(1, int(self.history_months)))[-1]
+        months = [ym for ym in month_range(first, last) if available is None or ym in available]
+        ids = {"id_asoc": id_asoc, "id_ap": id_ap}
+
+        part = target.with_name(target.name + ".part")
+        sink = RowSink(part, EXPORT_FIELDS, fmt)
+
+        def _open() -> None:
+            part.parent.mkdir(parents=True, exist_ok=True)
+            part.unlink(missing_ok=True)
+            sink.open()
+
+        def _finish() -> None:
+            sink.close()
+            os.replace(part, target)
+
+        def _discard() -> None:
+            sink.close()
+            part.unlink(missing_ok=True)
+
+        await self.hass.async_add_executor_job(_open)
+        index_rows = 0
+        try:
+            for i in range(0, len(months), self.max_concurrency):
+                batch = months[i : i + self.max_concurrency]
+                found = {
+                    ym: js
+                    for ym in batch
+                    if (js := self.cache.get_month(id_asoc, id_ap, ym)) is not None
+                }
+                found.update(await self._fetch_months([ym for ym in batch if ym not in found]))
+                meters, _, _ = reduce_history(found, batch, id_ap)
+                rows = [
+                    {"kind": "index", **ids, "luna": ym, "meter": meter, **m}
+                    for ym in batch
+                    for meter, m in meters.get(ym, {}).items()
+                ]
+                index_rows += len(rows)
+                await self.hass.async_add_executor_job(sink.write_many, rows)
+
+            # Without a start date every receipt up to `last` is exported, not only
+            # those from the first month that still has readings
+            receipts = self.cache.ledger.between(first if start else "", last)
+            for i in range(0, len(receipts), EXPORT_CHUNK):
+                rows = [
+                    {
+                        "kind": "plata",
+                        **ids,
+                        "luna": row.get("luna"),
+                        "data": row.get("data"),
+                        "key": key,
+                        "suma_bani": row["suma_bani"],
+                    }
+                    for key, row in receipts[i : i + EXPORT_CHUNK]
+                ]
+                await self.hass.async_add_executor_job(sink.write_many, rows)
+        except BaseException:
+            await asyncio.shield(self.hass.async_add_executor_job(_discard))
+            raise
+        await self.hass.async_add_executor_job(_finish)
+        return {
+            "path": str(target),
+            "start": first,
+            "end": last,
+            "months": len(months),
+            "index_rows": index_rows,
+            "payment_rows": len(receipts),
+        }
+
+    def _commit(self, data: dict) -> EBlocSnapshot:
+        """Diff data against the current snapshot, persist it and queue statistics."""
+        snapshot = EBlocSnapshot.from_dict(data)
+        self.changed_sections = _changed_sections(self.data, snapshot)
+        if "index" in self.changed_sections and self.cache.consumption.update(snapshot.months):
+            self.cache.schedule_save()
+        if self.changed_sections:
+            self.cache.set_snapshot(data)
+        if not self._statistics_synced or self.changed_sections & {"index", "plati"}:
+            self._statistics_synced = True
+            self.hass.async_create_background_task(
+                self.statistics.async_update(snapshot, self.cache.ledger.as_list()),
+                f"{self.name} statistics import",
+            )
+        return snapshot
+
+    def diagnostics(self) -> dict:
+        return {
+            "last_refresh_seconds": self.last_refresh_seconds,
+            "last_refresh_requests": self.last_refresh_requests,
+            "update_interval_seconds": (
+                self.update_interval.total_seconds() if self.update_interval else None
+            ),
+            "consecutive_failures": self._failures,
+            "month_cache_hits": self.month_cache_hits,
+            "month_cache_misses": self.month_cache_misses,
+            "months_skipped": self.months_skipped,
+            "backfill_pending": len(self._backlog),
+            "backfilled_months": self.backfilled_months,
+            "backfill_deferred": self.backfill_deferred,
+            "reduce_skipped": self.reduce_skipped,
+            "snapshot_reused": self.snapshot_reused,
+            "available_months": (
+                len(self.available_months) if self.available_months is not None else None
+            ),
+            "hub_shared": self.hub.shared,
+            "hub_shares_contoare": self.hub.shares_contoare,
+            "changed_sections": sorted(self.changed_sections),
+            "stage_seconds": self.stage_seconds,
+            "stage_failures": self.stage_failures,
+            "api": self.api.diagnostics(),
+        }
+
+    def _backoff(self) -> None:
+        self._failures += 1
+        if self.adaptive_polling:
+            self.update_interval = failure_interval(self._failures, self._fast_interval)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_COOKIE, DOMAIN
+from .coordinator import EBlocCoordinator
+
+TO_REDACT = {CONF_COOKIE}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    coordinator: EBlocCoordinator = hass.data[DOMAIN][entry.entry_id]
+    snapshot = coordinator.data
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "coordinator": coordinator.diagnostics(),
+        "snapshot": {
+            "luna": snapshot.luna if snapshot else None,
+            "months": len(snapshot.months) if snapshot else 0,
+            "payments": len(snapshot.payments) if snapshot else 0,
+            "ledger_receipts": len(coordinator.cache.ledger),
+            "meters": len(coordinator.cache.consumption.meters),
+        },
+    }
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from typing import Any
+
+from .const import REDUCE_NUMPY_ROWS
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+
+def prev_months(start_ym: str, count: int) -> list[str]:
+    """`count` months ending at start_ym, newest first."""
+    y, m = (int(x) for x in start_ym.split("-")[:2])
+    res = []
+    for i in range(count):
+        yy, mm = y, m - i
+        while mm <= 0:
+            yy -= 1
+            mm += 12
+        res.append(f"{yy:04d}-{mm:02d}")
+    return res
+
+
+def month_range(start_ym: str, end_ym: str) -> list[str]:
+    """Months from start_ym to end_ym inclusive, oldest first."""
+    sy, sm = (int(x) for x in start_ym.split("-")[:2])
+    ey, em = (int(x) for x in end_ym.split("-")[:2])
+    count = (ey * 12 + em) - (sy * 12 + sm) + 1
+    return prev_months(end_ym, count)[::-1] if count > 0 else []
+
+
+_LUNA = re.compile(r"\d{4}-(0[1-9]|1[0-2])")
+
+
+def available_months(payload) -> set[str]:
+    """Months listed by an AjaxGetIndexLuni payload, read from each row's "luna".
+
+    Rows come keyed by position ({"1": {"luna": "2024-06", ...}}) or as a list;
+    other fields (reading dates, labels) are ignored.
+    """
+    if isinstance(payload, dict):
+        rows = payload.values()
+    elif isinstance(payload, list):
+        rows = payload
+    else:
+        return set()
+    found: set[str] = set()
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        luna = str(row.get("luna") or "").strip()[:7]
+        if _LUNA.fullmatch(luna):
+            found.add(luna)
+    return found
+
+
+@lru_cache(maxsize=4096)
+def date_ordinal(dstr: str) -> int:
+    """Fixed-format YYYY-MM-DD -> proleptic ordinal; 0 when missing or malformed."""
+    if len(dstr) != 10 or dstr[4] != "-" or dstr[7] != "-":
+        return 0
+    try:
+        return date(int(dstr[:4]), int(dstr[5:7]), int(dstr[8:])).toordinal()
+    except ValueError:
+        return 0
+
+
+def _better(val: int, ordinal: int, best_val: int, best_ord: int) -> bool:
+    """Prefer the most recent reading date; without dates prefer the larger index."""
+    return ordinal > best_ord or (best_ord == 0 and ordinal == 0 and val > best_val)
+
+
+@dataclass(slots=True)
+class IndexColumns:
+    """Association payload rows flattened into parallel columns."""
+
+    months: list[str] = field(default_factory=list)
+    meters: list[str] = field(default_factory=list)
+    values: list[int] = field(default_factory=list)
+    ordinals: list[int] = field(default_factory=list)
+    dates: list[str | None] = field(default_factory=list)
+    tips: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def flatten(payloads: dict[str, Any], months: list[str], id_ap: str | None) -> IndexColumns:
+    """Flatten {month: AjaxGetIndexContoare payload} in `months` order.
+
+    Rows of other apartments and rows without a numeric index are dropped.
+    """
+    cols = IndexColumns()
+    for ym in months:
+        idx = payloads.get(ym)
+        if not isinstance(idx, dict):
+            continue
+        for key, row in idx.items():
+            if not isinstance(row, dict):
+                continue
+            if id_ap and str(row.get("id_ap", id_ap)) != str(id_ap):
+                continue
+            raw = row.get("index_nou", "0")
+            try:
+                val = raw if type(raw) is int else int(str(raw).strip() or 0)
+            except ValueError:
+                continue
+            dstr = row.get("data")
+            ordinal = date_ordinal(dstr) if isinstance(dstr, str) else 0
+            cols.months.append(ym)
+            cols.meters.append(str(row.get("id_contor") or row.get("id") or key))
+            cols.values.append(val)
+            cols.ordinals.append(ordinal)
+            cols.dates.append(dstr if ordinal else None)
+            cols.tips.append(row.get("titlu") or row.get("tip") or row.get("denumire") or "")
+    return cols
+
+
+def _select_python(cols: IndexColumns) -> list[int]:
+    """Winning row per (month, meter), groups in order of first appearance."""
+    best: dict[tuple[str, str], int] = {}
+    values, ordinals = cols.values, cols.ordinals
+    for i, group in enumerate(zip(cols.months, cols.meters, strict=True)):
+        j = best.get(group)
+        if j is None or _better(values[i], ordinals[i], values[j], ordinals[j]):
+            best[group] = i
+    return list(best.values())
+
+
+def _select_numpy(cols: IndexColumns) -> list[int]:
+    groups: dict[tuple[str, str], int] = {}
+    gid = np.fromiter(
+        (groups.setdefault(g, len(groups)) for g in zip(cols.months, cols.meters, strict=True)),
+        dtype=np.int64,
+        count=len(cols),
+    )
+    ordinals = np.asarray(cols.ordinals, dtype=np.int64)
+    has_date = ordinals > 0
+    # Dated rows rank by date, undated ones by index; ties keep the first row
+    rank = np.where(has_date, ordinals, np.asarray(cols.values, dtype=np.int64))
+    pos = np.arange(len(cols))
+    order = np.lexsort((-pos, rank, has_date, gid))
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = gid[order][1:] != gid[order][:-1]
+    return order[last].tolist()
+
+
+def reduce_history(
+    payloads: dict[str, Any], months: list[str], id_ap: str | None
+) -> tuple[dict[str, dict[str, dict]], dict[str, int], int | None]:
+    """Return ({month: {meter: {tip, index, data}}}, {month: index}, latest index)."""
+    cols = flatten(payloads, months, id_ap)
+    if not len(cols):
+        return {}, {}, None
+    if np is not None and len(cols) >= REDUCE_NUMPY_ROWS:
+        chosen = _select_numpy(cols)
+    else:
+        chosen = _select_python(cols)
+
+    meters: dict[str, dict[str, dict]] = {}
+    month_best: dict[str, int] = {}
+    for i in chosen:
+        ym = cols.months[i]
+        meters.setdefault(ym, {})[cols.meters[i]] = {
+            "tip": cols.tips[i],
+            "index": cols.values[i],
+            "data": cols.dates[i],
+        }
+        j = month_best.get(ym)
+        if j is None or _better(cols.values[i], cols.ordinals[i], cols.values[j], cols.ordinals[j]):
+            month_best[ym] = i
+
+    index_history: dict[str, int] = {}
+    latest: int | None = None
+    for ym in months:
+        i = month_best.get(ym)
+        if i is None:
+            continue
+        index_history[ym] = cols.values[i]
+        if latest is None or _better(
+            cols.values[i], cols.ordinals[i], cols.values[latest], cols.ordinals[latest]
+        ):
+            latest = i
+    return meters, index_history, cols.values[latest] if latest is not None else None
+
+
+def row_count(payloads: dict[str, Any]) -> int:
+    """Upper bound of the rows flatten() will produce."""
+    return sum(len(p) for p in payloads.values() if isinstance(p, dict))
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .api import EBlocAPI
+from .const import DOMAIN
+
+DATA_HUBS = "hubs"
+
+
+class EBlocHub:
+    """Association-wide fetcher shared by every config entry of one id_asoc.
+
+    AjaxGetIndexLuni returns the same payload for every apartment, so it is
+    fetched once through the API of one member and reused by the others until
+    it is older than max_age. AjaxGetIndexContoare with pIdAp=-1 carries every
+    apartment's rows and is only worth sharing when a member needs all of them
+    anyway (an entry without id_ap); otherwise each apartment asks for its own.
+    """
+
+    def __init__(self, id_asoc: str) -> None:
+        self.id_asoc = id_asoc
+        self._members: dict[str, EBlocAPI] = {}
+        self._cache: dict[tuple[str, str], tuple[float, Any]] = {}
+
+    @property
+    def shared(self) -> bool:
+        return len(self._members) > 1
+
+    @property
+    def shares_contoare(self) -> bool:
+        return self.shared and any(not api.id_ap for api in self._members.values())
+
+    @property
+    def api(self) -> EBlocAPI:
+        # Prefer a member whose session is known to work
+        for api in self._members.values():
+            if api.session_valid:
+                return api
+        return next(iter(self._members.values()))
+
+    def add(self, entry_id: str, api: EBlocAPI) -> None:
+        self._members[entry_id] = api
+
+    def remove(self, entry_id: str) -> bool:
+        """Drop a member; returns True when the hub has no members left."""
+        self._members.pop(entry_id, None)
+        return not self._members
+
+    async def _cached(self, key: tuple[str, str], max_age: float, fetch) -> Any:
+        hit = self._cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] < max_age:
+            return hit[1]
+        result = await fetch()
+        now = time.monotonic()
+        # Only entries of the same kind share this max_age
+        self._cache = {
+            k: v for k, v in self._cache.items() if k[0] != key[0] or now - v[0] < max_age
+        }
+        self._cache[key] = (now, result)
+        return result
+
+    async def async_index_contoare(self, luna: str, max_age: float) -> dict[str, Any]:
+        return await self._cached(
+            ("contoare", luna),
+            max_age,
+            lambda: self.api.get_index_contoare(luna=luna, pIdAp="-1"),
+        )
+
+    async def async_index_luni(self, max_age: float) -> dict[str, Any]:
+        return await self._cached(("luni", ""), max_age, self.api.get_index_luni)
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+
+
+def acquire_hub(hass: HomeAssistant, entry_id: str, api: EBlocAPI) -> EBlocHub:
+    hubs: dict[str, EBlocHub] = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_HUBS, {})
+    key = str(api.id_asoc)
+    hub = hubs.get(key)
+    if hub is None:
+        hub = hubs[key] = EBlocHub(key)
+    hub.add(entry_id, api)
+    return hub
+
+
+def release_hub(hass: HomeAssistant, entry_id: str, hub: EBlocHub) -> None:
+    hubs: dict[str, EBlocHub] = hass.data.get(DOMAIN, {}).get(DATA_HUBS, {})
+    if hub.remove(entry_id):
+        hubs.pop(hub.id_asoc, None)
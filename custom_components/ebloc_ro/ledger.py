@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Any
+
+from .money import bani
+
+# Fields that identify a receipt, in order of preference
+_RECEIPT_ID_FIELDS = ("id_chitanta", "nr_chitanta", "id")
+
+
+def receipt_key(row: dict[str, Any]) -> str:
+    for name in _RECEIPT_ID_FIELDS:
+        value = row.get(name)
+        if value not in (None, ""):
+            return f"{name}:{value}"
+    return f"luna:{row.get('luna', '')}:{row.get('suma', '')}:{row.get('data', '')}"
+
+
+class PaymentLedger:
+    """Local record of every receipt seen, merged incrementally on each poll.
+
+    Receipts are kept in a list sorted by (luna, key) so the newest N can be
+    read without re-sorting, and per-year totals are updated as rows arrive.
+    """
+
+    def __init__(self) -> None:
+        self._rows: dict[str, dict[str, Any]] = {}
+        self._order: list[tuple[str, str]] = []
+        self._by_year: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _account(self, row: dict[str, Any], sign: int) -> None:
+        year = str(row.get("luna", ""))[:4]
+        self._by_year[year] = self._by_year.get(year, 0) + sign * row["suma_bani"]
+
+    def merge(self, rows: list[dict[str, Any]]) -> int:
+        """Add unknown receipts and replace changed ones; returns how many changed."""
+        changed = 0
+        for raw in rows:
+            key = receipt_key(raw)
+            row = {**raw, "suma_bani": bani(raw.get("suma"))}
+            old = self._rows.get(key)
+            if old == row:
+                continue
+            if old is not None:
+                self._account(old, -1)
+                self._order.remove((old.get("luna", ""), key))
+            self._rows[key] = row
+            insort(self._order, (row.get("luna", ""), key))
+            self._account(row, 1)
+            changed += 1
+        return changed
+
+    def top(self, n: int | None) -> list[dict[str, Any]]:
+        """Newest n receipts (all when n is falsy), newest first."""
+        order = self._order[-n:] if n else self._order
+        return [self._rows[key] for _, key in reversed(order)]
+
+    def between(self, start: str, end: str) -> list[tuple[str, dict[str, Any]]]:
+        """(key, row) of receipts whose luna is in [start, end] (YYYY-MM), oldest first."""
+        lo = bisect_left(self._order, (start, ""))
+        hi = bisect_left(self._order, (end + "\uffff", ""))
+        return [(key, self._rows[key]) for _, key in self._order[lo:hi]]
+
+    def total_paid(self, year: int | str) -> int:
+        """Total paid in bani for receipts whose luna falls in year."""
+        return self._by_year.get(str(year), 0)
+
+    def clear(self) -> None:
+        self._rows.clear()
+        self._order.clear()
+        self._by_year.clear()
+
+    def as_list(self) -> list[dict[str, Any]]:
+        return list(self._rows.values())
+
+    @classmethod
+    def from_list(cls, rows: list[dict[str, Any]]) -> PaymentLedger:
+        ledger = cls()
+        ledger.merge(rows)
+        return ledger
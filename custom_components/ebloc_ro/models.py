@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from .money import amount_cents, bani
+
+_T = TypeVar("_T")
+
+
+def _truthy(value: Any) -> bool:
+    return str(value or "0").strip() in ("1", "true", "True")
+
+
+@dataclass(frozen=True, slots=True)
+class HomeInfo:
+    cod_client: str | None
+    ap: str | None
+    nr_pers_afisat: str | None
+    datorie_bani: int
+    ultima_zi_plata: str | None
+    contoare_citite: bool
+    citire_contoare_start: str | None
+    citire_contoare_end: str | None
+    luna_afisata: str | None
+    nivel_restanta: str | None
+    raw: dict[str, Any]
+
+    @classmethod
+    def from_raw(cls, raw: dict[str, Any], datorie_bani: int | None = None) -> HomeInfo:
+        if datorie_bani is None:
+            datorie_bani = amount_cents(raw.get("datorie", "0"))
+        return cls(
+            cod_client=raw.get("cod_client"),
+            ap=raw.get("ap"),
+            nr_pers_afisat=raw.get("nr_pers_afisat"),
+            datorie_bani=datorie_bani,
+            ultima_zi_plata=raw.get("ultima_zi_plata"),
+            contoare_citite=_truthy(raw.get("contoare_citite")),
+            citire_contoare_start=raw.get("citire_contoare_start"),
+            citire_contoare_end=raw.get("citire_contoare_end"),
+            luna_afisata=raw.get("luna_afisata"),
+            nivel_restanta=raw.get("nivel_restanta"),
+            raw=raw,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class MeterReading:
+    meter: str
+    tip: str
+    index: int
+    data: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class MonthIndex:
+    luna: str
+    value: int
+    meters: tuple[MeterReading, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class PaymentRow:
+    luna: str
+    suma_bani: int
+    raw: dict[str, Any]
+
+    @classmethod
+    def from_raw(cls, raw: dict[str, Any]) -> PaymentRow:
+        if raw.get("suma_bani") is None:
+            raw = {**raw, "suma_bani": bani(raw.get("suma"))}
+        return cls(luna=raw.get("luna", "n/a"), suma_bani=raw["suma_bani"], raw=raw)
+
+
+@dataclass(frozen=True, slots=True)
+class EBlocSnapshot:
+    """Parsed, immutable view of one refresh; months and payments are newest first."""
+
+    home: HomeInfo
+    luna: str | None
+    months: tuple[MonthIndex, ...]
+    latest_index: int | None
+    payments: tuple[PaymentRow, ...]
+    _memo: dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+    def memo(self, key: str, factory: Callable[[], _T]) -> _T:
+        """Compute a derived value once per snapshot."""
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = factory()
+            return value
+
+    @property
+    def index_history(self) -> dict[str, int]:
+        return self.memo("index_history", lambda: {m.luna: m.value for m in self.months})
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> EBlocSnapshot:
+        """Build from the coordinator/Store layout (older snapshots lack the parsed amounts)."""
+        history = data.get("index_history") or {}
+        meters = data.get("meters") or {}
+        months = tuple(
+            MonthIndex(
+                luna=luna,
+                value=int(history[luna]),
+                meters=tuple(
+                    MeterReading(meter, m.get("tip", ""), int(m["index"]), m.get("data"))
+                    for meter, m in (meters.get(luna) or {}).items()
+                ),
+            )
+            for luna in sorted(history, reverse=True)
+        )
+        plati = data.get("plati") or {}
+        payments = sorted(
+            (PaymentRow.from_raw(r) for r in plati.values() if isinstance(r, dict)),
+            key=lambda p: p.luna,
+            reverse=True,
+        )
+        return cls(
+            home=HomeInfo.from_raw(data.get("home") or {}, data.get("datorie_bani")),
+            luna=data.get("luna"),
+            months=months,
+            latest_index=data.get("latest_index"),
+            payments=tuple(payments),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "home": self.home.raw,
+            "datorie_bani": self.home.datorie_bani,
+            "index_history": self.index_history,
+            "latest_index": self.latest_index,
+            "meters": {
+                m.luna: {
+                    r.meter: {"tip": r.tip, "index": r.index, "data": r.data} for r in m.meters
+                }
+                for m in self.months
+            },
+            "plati": {str(i + 1): p.raw for i, p in enumerate(self.payments)},
+            "luna": self.luna,
+        }
+
+
+EMPTY_SNAPSHOT = EBlocSnapshot.from_dict({})
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any
+
+_NON_NUMERIC = re.compile(r"[^0-9,.\-]")
+_NON_DIGIT = re.compile(r"[^0-9\-]")
+
+
+@lru_cache(maxsize=1024)
+def _amount_cents(s: str) -> int:
+    # Fast path: plain ASCII integer (bani when large, lei otherwise); str.isdigit alone
+    # also accepts "²" or Arabic-Indic digits, which int() rejects or reads as numbers
+    if s.isascii() and s.isdigit():
+        n = int(s)
+        return n if n >= 1000 else n * 100
+
+    # Păstrăm doar cifre, separator decimal și minus
+    cleaned = _NON_NUMERIC.sub("", s)
+    if "," in cleaned and "." in cleaned:
+        # Alege separatorul decimal după ultima apariție
+        if cleaned.rfind(",") > cleaned.rfind("."):
+            dec, thou = ",", "."
+        else:
+            dec, thou = ".", ","
+        cleaned = cleaned.replace(thou, "").replace(dec, ".")
+    elif "," in cleaned:
+        # Virgula ca decimal; punctul ca mii
+        cleaned = cleaned.replace(".", "").replace(",", ".")
+    else:
+        # Doar puncte sau fără separatori -> normalizează mai multe puncte
+        parts = cleaned.split(".")
+        if len(parts) > 2:
+            cleaned = "".join(parts[:-1]) + "." + parts[-1]
+
+    try:
+        cents = round(float(cleaned) * 100)
+    except ValueError:
+        # Fallback: tratează un șir numeric simplu ca bani (ex. '27049' -> 270.49)
+        try:
+            return int(_NON_DIGIT.sub("", s) or 0)
+        except ValueError:
+            return 0
+
+    # Heuristic: dacă nu exista niciun separator în original și numărul e mare, probabil e în bani
+    if cents >= 100000 and "," not in s and "." not in s:
+        cents = round(cents / 100)
+    return cents
+
+
+def amount_cents(value: Any) -> int:
+    """Parse amounts like '270,49', '270.49', '27049', '1.234,56 RON' into bani."""
+    if value is None:
+        return 0
+    return _amount_cents(str(value).strip())
+
+
+@lru_cache(maxsize=1024)
+def _bani(s: str) -> int:
+    try:
+        return int(s)
+    except ValueError:
+        try:
+            return round(float(s))
+        except ValueError:
+            return 0
+
+
+def bani(value: Any) -> int:
+    """Parse a value the API already reports in bani (e.g. PlatiChitante 'suma')."""
+    if isinstance(value, int):
+        return value
+    return _bani(str(value or "0").strip())
+
+
+def lei(cents: int) -> float:
+    return round(cents / 100.0, 2)
+
+
+def fmt_lei(cents: int) -> str:
+    return f"{cents / 100.0:.2f} RON"
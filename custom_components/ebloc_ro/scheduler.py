@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import random
+from datetime import date, datetime, timedelta
+from typing import Any
+
+# Poll slowly when nothing is due, but never sleep past the next interesting date
+IDLE_INTERVAL = timedelta(hours=6)
+QUIET_INTERVAL = timedelta(hours=24)
+QUIET_AFTER = timedelta(days=7)
+PAYMENT_LEAD = timedelta(days=3)
+WINDOW_LEAD = timedelta(days=1)
+
+FAILURE_BACKOFF_START = timedelta(minutes=5)
+FAILURE_BACKOFF_MAX = timedelta(hours=6)
+FAILURE_JITTER = 0.2
+
+_DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S")
+
+
+class _Unparsed(ValueError):
+    """A date field is set but in none of _DATE_FORMATS."""
+
+
+def _parse_day(value: Any) -> date | None:
+    s = str(value or "").strip()
+    if not s:
+        return None
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            continue
+    raise _Unparsed(s)
+
+
+def _truthy(value: Any) -> bool:
+    return str(value or "0").strip() in ("1", "true", "True")
+
+
+def _has_debt(value: Any) -> bool:
+    return any(c in "123456789" for c in str(value or ""))
+
+
+def next_interval(home: dict[str, Any], now: datetime, fast: timedelta) -> timedelta:
+    """Pick the next poll delay from the reading window and payment deadline in home info.
+
+    Inside the meter-reading window (until the readings are sent) and close to
+    the payment deadline (while something is owed) the configured interval is used; otherwise polling
+    backs off to IDLE_INTERVAL, or QUIET_INTERVAL when nothing is due for a week.
+    Without any usable date (empty home info, a date in an unknown format) the
+    configured interval is kept, so a window is never slept through.
+    """
+    today = now.date()
+    try:
+        start = _parse_day(home.get("citire_contoare_start"))
+        end = _parse_day(home.get("citire_contoare_end"))
+        deadline = _parse_day(home.get("ultima_zi_plata"))
+    except _Unparsed:
+        return fast
+    if not (start and end) and not deadline:
+        return fast
+    if not _has_debt(home.get("datorie")):
+        deadline = None
+
+    upcoming: list[date] = []
+    if start and end and not _truthy(home.get("contoare_citite")):
+        if start - WINDOW_LEAD <= today <= end:
+            return fast
+        if today < start:
+            upcoming.append(start - WINDOW_LEAD)
+    if deadline:
+        if deadline - PAYMENT_LEAD <= today <= deadline:
+            return fast
+        if today < deadline:
+            upcoming.append(deadline - PAYMENT_LEAD)
+
+    slow = IDLE_INTERVAL
+    if not upcoming or min(upcoming) - today > QUIET_AFTER:
+        slow = QUIET_INTERVAL
+    if upcoming:
+        wake = datetime.combine(min(upcoming), datetime.min.time(), now.tzinfo) - now
+        slow = min(slow, wake)
+    return max(fast, slow)
+
+
+def failure_interval(failures: int, fast: timedelta = timedelta(0)) -> timedelta:
+    """Exponential backoff with jitter after consecutive failed refreshes, never below fast."""
+    delay = min(FAILURE_BACKOFF_MAX, FAILURE_BACKOFF_START * 2 ** max(0, failures - 1))
+    return max(fast, delay * random.uniform(1 - FAILURE_JITTER, 1 + FAILURE_JITTER))
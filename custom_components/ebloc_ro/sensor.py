@@ -1,57 +1,16 @@
 from __future__ import annotations
 
-import re
-
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfTime, UnitOfVolume
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import ATTRIBUTION, DOMAIN
 from .coordinator import EBlocCoordinator
-
-
-def _parse_amount(value) -> float:
-    """Parse amounts like '270,49', '270.49', '27049', '270.49 RON', '270,49 RON'."""
-    s = str(value).strip()
-    if not s:
-        return 0.0
-
-    original = s
-    # Păstrăm doar cifre, separator decimal și minus
-    cleaned = re.sub(r"[^0-9,.\-]", "", s)
-
-    if "," in cleaned and "." in cleaned:
-        # Alege separatorul decimal după ultima apariție
-        if cleaned.rfind(",") > cleaned.rfind("."):
-            dec = ","
-            thou = "."
-        else:
-            dec = "."
-            thou = ","
-        cleaned = cleaned.replace(thou, "").replace(dec, ".")
-    elif "," in cleaned:
-        # Virgula ca decimal; punctul ca mii
-        cleaned = cleaned.replace(".", "").replace(",", ".")
-    else:
-        # Doar puncte sau fără separatori -> normalizează mai multe puncte
-        parts = cleaned.split(".")
-        if len(parts) > 2:
-            cleaned = "".join(parts[:-1]) + "." + parts[-1]
-
-    try:
-        val = float(cleaned)
-    except Exception:
-        # Fallback: tratează un șir numeric simplu ca bani (ex. '27049' -> 270.49)
-        digits = re.sub(r"[^0-9\-]", "", original)
-        val = float(int(digits)) / 100.0 if digits else 0.0
-
-    # Heuristic: dacă nu exista niciun separator în original și numărul e mare, probabil e în bani
-    if val >= 1000 and ("," not in original and "." not in original):
-        val = val / 100.0
-
-    return round(val, 2)
+from .models import EMPTY_SNAPSHOT, EBlocSnapshot
+from .money import fmt_lei, lei
 
 
 async def async_setup_entry(
@@ -76,6 +35,12 @@ async def async_setup_entry(
             ent = er_reg.async_get_entity_id("sensor", DOMAIN, unique_id)
             if ent and ent.startswith("sensor.e_bloc_"):
                 er_reg.async_update_entity(ent, new_entity_id=target_eid)
+        # These sensors used one unique_id for every entry; scope the ones this entry owns
+        for base in _SCOPED_UNIQUE_IDS:
+            ent = er_reg.async_get_entity_id("sensor", DOMAIN, base)
+            reg_entry = er_reg.async_get(ent) if ent else None
+            if reg_entry and reg_entry.config_entry_id == entry.entry_id:
+                er_reg.async_update_entity(ent, new_unique_id=_scoped_unique_id(coordinator, base))
     except Exception:
         # best-effort; nu blocăm setup-ul
         pass
@@ -84,50 +49,106 @@ async def async_setup_entry(
     entities.append(EblocFacturaRestantaSensor(coordinator))
     entities.append(EblocIndexContorSensor(coordinator))
     entities.append(EblocIstoricFacturiSensor(coordinator))
+    entities.append(EblocDurataActualizareSensor(coordinator))
+
+    # One consumption sensor per meter; meters that show up later are added on refresh
+    known_meters: set[str] = set()
+
+    def _new_meter_sensors() -> list[SensorEntity]:
+        new = [m for m in coordinator.cache.consumption.meters if m not in known_meters]
+        known_meters.update(new)
+        return [EblocConsumContorSensor(coordinator, meter) for meter in new]
+
+    @callback
+    def _add_new_meters() -> None:
+        if new := _new_meter_sensors():
+            async_add_entities(new)
+
+    entities.extend(_new_meter_sensors())
+    entry.async_on_unload(coordinator.async_add_listener(_add_new_meters))
 
     async_add_entities(entities)
 
 
+_SCOPED_UNIQUE_IDS = (
+    "ebloc_date_utilizator",
+    "ebloc_factura_restanta",
+    "ebloc_index_contor",
+    "ebloc_istoric_facturi",
+    "ebloc_durata_actualizare",
+)
+
+
+def _scoped_unique_id(coordinator: EBlocCoordinator, base: str) -> str:
+    api = coordinator.api
+    return f"{base}_{api.id_asoc}_{api.id_ap or 'all'}"
+
+
 class BaseEBlocSensor(CoordinatorEntity[EBlocCoordinator], SensorEntity):
     _attr_has_entity_name = False
+    # Scoped per association/apartment in __init__ so several entries can coexist
+    _unique_id_base: str | None = None
+    # Coordinator section this sensor is built from (see coordinator.SECTIONS)
+    _section: str | None = None
+    _last_available: bool | None = None
+
+    def __init__(self, coordinator: EBlocCoordinator) -> None:
+        super().__init__(coordinator)
+        if self._unique_id_base is not None:
+            self._attr_unique_id = _scoped_unique_id(coordinator, self._unique_id_base)
 
     @property
     def attribution(self) -> str | None:
         return ATTRIBUTION
 
+    @property
+    def available(self) -> bool:
+        # Restored values stay visible until a network refresh succeeds
+        return super().available or self.coordinator.restored
+
+    @property
+    def snapshot(self) -> EBlocSnapshot:
+        return self.coordinator.data or EMPTY_SNAPSHOT
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        available = self.available
+        if (
+            self._section is not None
+            and self._section not in self.coordinator.changed_sections
+            and available == self._last_available
+        ):
+            return
+        self._last_available = available
+        super()._handle_coordinator_update()
+
 
 class EblocDateUtilizatorSensor(BaseEBlocSensor):
     _attr_name = "eBloc Date Utilizator"
     _attr_icon = "mdi:account"
-    _attr_unique_id = "ebloc_date_utilizator"
+    _unique_id_base = "ebloc_date_utilizator"
+    _section = "home"
 
     @property
     def native_value(self):
-        home = (self.coordinator.data or {}).get("home", {})
-        return home.get("cod_client")
+        return self.snapshot.home.cod_client
 
     @property
     def extra_state_attributes(self):
-        h = (self.coordinator.data or {}).get("home", {})
-
-        def fmt_lei(val):
-            try:
-                return f"{_parse_amount(val):.2f} RON"
-            except Exception:
-                return str(val)
+        return self.snapshot.memo("date_utilizator", self._build_attributes)
 
+    def _build_attributes(self) -> dict:
+        h = self.snapshot.home
         attrs = {
-            "Cod client": h.get("cod_client"),
-            "Apartament": h.get("ap"),
-            "Persoane declarate": h.get("nr_pers_afisat"),
-            "Restanță de plată": fmt_lei(h.get("datorie", "0")),
-            "Ultima zi de plată": h.get("ultima_zi_plata"),
-            "Contor trimis": (
-                "Da" if str(h.get("contoare_citite", "0")) in ("1", "true", "True") else "Nu"
-            ),
-            "Începere citire contoare": h.get("citire_contoare_start"),
-            "Încheiere citire contoare": h.get("citire_contoare_end"),
-            "Luna afișată": h.get("luna_afisata"),
+            "Cod client": h.cod_client,
+            "Apartament": h.ap,
+            "Persoane declarate": h.nr_pers_afisat,
+            "Restanță de plată": fmt_lei(h.datorie_bani),
+            "Ultima zi de plată": h.ultima_zi_plata,
+            "Contor trimis": "Da" if h.contoare_citite else "Nu",
+            "Începere citire contoare": h.citire_contoare_start,
+            "Încheiere citire contoare": h.citire_contoare_end,
+            "Luna afișată": h.luna_afisata,
         }
         return {k: v for k, v in attrs.items() if v not in (None, "")}
 
@@ -135,70 +156,103 @@ class EblocDateUtilizatorSensor(BaseEBlocSensor):
 class EblocFacturaRestantaSensor(BaseEBlocSensor):
     _attr_name = "eBloc Factura Restanta"
     _attr_icon = "mdi:file-document-alert"
-    _attr_unique_id = "ebloc_factura_restanta"
+    _unique_id_base = "ebloc_factura_restanta"
+    _section = "home"
 
     @property
     def native_value(self):
-        h = (self.coordinator.data or {}).get("home", {})
-        val = h.get("datorie", "0")
-        try:
-            return _parse_amount(val)
-        except Exception:
-            return 0.0
+        return lei(self.snapshot.home.datorie_bani)
 
     @property
     def extra_state_attributes(self):
-        h = (self.coordinator.data or {}).get("home", {})
+        h = self.snapshot.home
         return {
-            "Luna afișată": h.get("luna_afisata"),
-            "Ultima zi de plată": h.get("ultima_zi_plata"),
-            "Nivel restanță": h.get("nivel_restanta"),
+            "Luna afișată": h.luna_afisata,
+            "Ultima zi de plată": h.ultima_zi_plata,
+            "Nivel restanță": h.nivel_restanta,
         }
 
 
 class EblocIndexContorSensor(BaseEBlocSensor):
     _attr_name = "eBloc Index Contor"
     _attr_icon = "mdi:counter"
-    _attr_unique_id = "ebloc_index_contor"
+    _unique_id_base = "ebloc_index_contor"
+    _section = "index"
 
     @property
     def native_value(self):
-        # latest index value computed in coordinator
-        return (getattr(self.coordinator, "data", {}) or {}).get("latest_index")
-
-    @property
-    def extra_state_attributes(self):
-        # month -> index mapping for configured history
-        return (getattr(self.coordinator, "data", {}) or {}).get("index_history", {})
+        # latest index value computed in coordinator; history lives in long-term statistics
+        return self.snapshot.latest_index
 
 
 class EblocIstoricFacturiSensor(BaseEBlocSensor):
     _attr_name = "eBloc Istoric Facturi"
     _attr_icon = "mdi:history"
-    _attr_unique_id = "ebloc_istoric_facturi"
+    _unique_id_base = "ebloc_istoric_facturi"
+    _section = "plati"
+
+    @property
+    def native_value(self):
+        payments = self.snapshot.payments
+        return lei(payments[0].suma_bani) if payments else None
+
+    @property
+    def extra_state_attributes(self):
+        payments = self.snapshot.payments
+        return {"Luna": payments[0].luna} if payments else {}
+
+
+class EblocDurataActualizareSensor(BaseEBlocSensor):
+    _attr_name = "eBloc Durata Actualizare"
+    _attr_icon = "mdi:timer-outline"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _unique_id_base = "ebloc_durata_actualizare"
+
+    @property
+    def native_value(self):
+        return self.coordinator.last_refresh_seconds
+
+    @property
+    def extra_state_attributes(self):
+        return {"Cereri": self.coordinator.last_refresh_requests}
+
+
+def _is_water_meter(tip: str) -> bool:
+    t = tip.lower()
+    return "repartitor" not in t and any(w in t for w in ("apa", "apă", "water"))
+
+
+class EblocConsumContorSensor(BaseEBlocSensor):
+    _attr_icon = "mdi:water"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _section = "index"
+
+    def __init__(self, coordinator: EBlocCoordinator, meter: str) -> None:
+        super().__init__(coordinator)
+        self._meter = meter
+        api = coordinator.api
+        self._attr_unique_id = f"ebloc_consum_{api.id_asoc}_{api.id_ap or 'all'}_{meter}"
+        state = coordinator.cache.consumption.meters.get(meter)
+        tip = state.tip if state and state.tip else ""
+        self._attr_name = f"eBloc Consum {tip or meter}"
+        # Water meters count m³ and feed the Water dashboard; heat-cost allocators
+        # ("Repartitor") count unitless impulses
+        if _is_water_meter(tip):
+            self._attr_device_class = SensorDeviceClass.WATER
+            self._attr_native_unit_of_measurement = UnitOfVolume.CUBIC_METERS
+        elif "repartitor" in tip.lower():
+            self._attr_icon = "mdi:radiator"
 
     @property
     def native_value(self):
-        pl = (self.coordinator.data or {}).get("plati", {})
-        if not pl:
-            return None
-        first = next(iter(pl.values()))
-        try:
-            return round(float(first.get("suma", "0")) / 100.0, 2)
-        except Exception:
-            return None
+        state = self.coordinator.cache.consumption.meters.get(self._meter)
+        return state.total if state else None
 
     @property
     def extra_state_attributes(self):
-        pl = (self.coordinator.data or {}).get("plati", {})
-        months = {}
-        for row in pl.values():
-            luna = row.get("luna", "n/a")
-            try:
-                suma = float(row.get("suma", "0")) / 100.0
-            except Exception:
-                suma = 0.0
-            months[luna] = f"{suma:.2f} RON"
-        # order desc by month key
-        ordered = dict(sorted(months.items(), key=lambda kv: kv[0], reverse=True))
-        return ordered
+        state = self.coordinator.cache.consumption.meters.get(self._meter)
+        if state is None:
+            return {}
+        return {"Luna": state.luna, "Index": state.index, "Consum luna": state.delta}
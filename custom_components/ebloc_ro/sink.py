@@ -0,0 +1,58 @@
+"""Append-only row files shared by the bulk collector and history export."""
+
+from __future__ import annotations
+
+import csv
+import json
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+
+class RowSink:
+    """Append-only JSON Lines or CSV file with a fixed set of columns."""
+
+    def __init__(self, path: Path, fields: Sequence[str], fmt: str) -> None:
+        self.path = path
+        self.fields = fields
+        self.fmt = fmt
+        self.written = 0
+        self._fh = None
+        self._csv: csv.DictWriter | None = None
+
+    def rows(self) -> Iterator[dict[str, Any]]:
+        """Stream the rows already in the file."""
+        if not self.path.exists():
+            return
+        with self.path.open(newline="", encoding="utf-8") as fh:
+            if self.fmt == "csv":
+                yield from csv.DictReader(fh)
+            else:
+                for line in fh:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def open(self) -> None:
+        new = not self.path.exists() or self.path.stat().st_size == 0
+        self._fh = self.path.open("a", newline="", encoding="utf-8")
+        if self.fmt == "csv":
+            self._csv = csv.DictWriter(self._fh, fieldnames=self.fields, extrasaction="ignore")
+            if new:
+                self._csv.writeheader()
+
+    def write(self, row: dict[str, Any]) -> None:
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            self._fh.write(json.dumps({k: row.get(k) for k in self.fields}, ensure_ascii=False))
+            self._fh.write("\n")
+        self.written += 1
+
+    def write_many(self, rows: Iterable[dict[str, Any]]) -> None:
+        for row in rows:
+            self.write(row)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
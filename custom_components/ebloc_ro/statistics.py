@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .models import EBlocSnapshot
+from .money import bani
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _month_start(luna: str) -> datetime:
+    y, m = (int(x) for x in luna.split("-")[:2])
+    return dt_util.as_utc(datetime(y, m, 1, tzinfo=dt_util.DEFAULT_TIME_ZONE))
+
+
+class EBlocStatistics:
+    """Push monthly meter indices and bills into long-term statistics.
+
+    The full history is backfilled on the first run; afterwards only the
+    last imported month (which may still change) and newer ones are written,
+    unless a full re-import is requested once older months were backfilled.
+    """
+
+    def __init__(self, hass: HomeAssistant, id_asoc: str | None, id_ap: str | None) -> None:
+        self.hass = hass
+        suffix = f"{id_asoc}_{id_ap or 'all'}".lower()
+        self.index_id = f"{DOMAIN}:index_contor_{suffix}"
+        self.facturi_id = f"{DOMAIN}:facturi_{suffix}"
+        # statistic_id -> (start timestamp, sum, state) of the last imported month
+        self._last: dict[str, tuple[float, float, float] | None] = {}
+        self._lock = asyncio.Lock()
+
+    async def _last_stat(self, statistic_id: str) -> tuple[float, float, float] | None:
+        if statistic_id not in self._last:
+            res = await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics, self.hass, 1, statistic_id, True, {"sum", "state"}
+            )
+            rows = res.get(statistic_id)
+            self._last[statistic_id] = (
+                (rows[0]["start"], rows[0].get("sum") or 0.0, rows[0].get("state") or 0.0)
+                if rows
+                else None
+            )
+        return self._last[statistic_id]
+
+    async def _import(
+        self,
+        statistic_id: str,
+        name: str,
+        unit: str | None,
+        points: dict[str, float],
+        cumulative: bool,
+        full: bool = False,
+    ) -> None:
+        last = None if full else await self._last_stat(statistic_id)
+        total = 0.0
+        if last is not None:
+            total = last[1] - last[2] if cumulative else last[1]
+        stats: list[StatisticData] = []
+        for luna in sorted(points):
+            start = _month_start(luna)
+            if last is not None and start.timestamp() < last[0]:
+                continue
+            state = points[luna]
+            total = total + state if cumulative else state
+            stats.append(StatisticData(start=start, state=state, sum=total))
+        if not stats:
+            return
+        meta = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=name,
+            source=DOMAIN,
+            statistic_id=statistic_id,
+            unit_of_measurement=unit,
+        )
+        async_add_external_statistics(self.hass, meta, stats)
+        self._last[statistic_id] = (stats[-1]["start"].timestamp(), total, stats[-1]["state"])
+
+    async def async_update(
+        self, snapshot: EBlocSnapshot, receipts: list[dict[str, Any]], full: bool = False
+    ) -> None:
+        """Import new months; full=True rewrites the whole history (after a backfill)."""
+        async with self._lock:
+            try:
+                index = {m.luna: float(m.value) for m in reversed(snapshot.months)}
+                await self._import(self.index_id, "eBloc Index Contor", None, index, False, full)
+
+                facturi: dict[str, float] = {}
+                for row in receipts:
+                    luna = str(row.get("luna", ""))
+                    if len(luna) >= 7:
+                        cents = row.get("suma_bani")
+                        cents = bani(row.get("suma")) if cents is None else cents
+                        facturi[luna[:7]] = facturi.get(luna[:7], 0.0) + cents / 100.0
+                await self._import(
+                    self.facturi_id, "eBloc Istoric Facturi", "RON", facturi, True, full
+                )
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.warning("Import statistici e-Bloc eșuat: %s", err)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    BACKFILL_RETRY_HOURS,
+    CACHE_MAX_MONTH_AGE,
+    CACHE_MAX_MONTHS,
+    DOMAIN,
+    PLATI_MAX_AGE_HOURS,
+    STORAGE_VERSION,
+)
+from .consumption import ConsumptionTracker
+from .history import prev_months
+from .ledger import PaymentLedger
+
+_LOGGER = logging.getLogger(__name__)
+
+SAVE_DELAY = 10
+
+
+class EBlocCache:
+    """Disk-backed cache of closed months, the payments ledger and the last good snapshot."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._months: dict[str, dict[str, Any]] = {}
+        # Months whose backfill failed: attempt count and time of the last attempt
+        self._misses: dict[str, dict[str, float]] = {}
+        self._plati: dict[str, Any] | None = None
+        self.ledger = PaymentLedger()
+        self.consumption = ConsumptionTracker()
+        self._snapshot: dict[str, Any] | None = None
+
+    @staticmethod
+    def _key(id_asoc: str | None, id_ap: str | None, luna: str) -> str:
+        return f"{id_asoc}_{id_ap or 'all'}_{luna}"
+
+    async def async_load(self) -> None:
+        try:
+            data = await self._store.async_load() or {}
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.warning("Cache e-Bloc ilizibil, se ignoră: %s", err)
+            data = {}
+        self._months = data.get("months") or {}
+        self._misses = data.get("misses") or {}
+        self._plati = data.get("plati")
+        self.ledger = PaymentLedger.from_list(data.get("ledger") or [])
+        self.consumption = ConsumptionTracker.from_dict(data.get("consumption") or {})
+        self._snapshot = data.get("snapshot")
+        self._evict()
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "months": self._months,
+            "misses": self._misses,
+            "plati": self._plati,
+            "ledger": self.ledger.as_list(),
+            "consumption": self.consumption.as_dict(),
+            "snapshot": self._snapshot,
+        }
+
+    def schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @staticmethod
+    def _luna(key: str) -> str:
+        return key.rsplit("_", 1)[-1]
+
+    def _evict(self) -> None:
+        """Drop months more than CACHE_MAX_MONTH_AGE before the newest cached month,
+        then keep the newest CACHE_MAX_MONTHS."""
+        newest = max((self._luna(k) for k in (*self._months, *self._misses)), default=None)
+        if newest is None:
+            return
+        cutoff = prev_months(newest, CACHE_MAX_MONTH_AGE)[-1]
+        months = {k: v for k, v in self._months.items() if self._luna(k) >= cutoff}
+        if len(months) > CACHE_MAX_MONTHS:
+            keep = sorted(months, key=self._luna, reverse=True)[:CACHE_MAX_MONTHS]
+            months = {k: months[k] for k in keep}
+        self._months = months
+        self._misses = {k: v for k, v in self._misses.items() if self._luna(k) >= cutoff}
+
+    @property
+    def snapshot(self) -> dict[str, Any] | None:
+        return self._snapshot
+
+    def get_month(self, id_asoc: str | None, id_ap: str | None, luna: str) -> dict | None:
+        hit = self._months.get(self._key(id_asoc, id_ap, luna))
+        return None if hit is None else hit.get("data")
+
+    def set_month(self, id_asoc: str | None, id_ap: str | None, luna: str, data: dict) -> None:
+        key = self._key(id_asoc, id_ap, luna)
+        self._months[key] = {"ts": time.time(), "data": data}
+        self._misses.pop(key, None)
+
+    def note_miss(self, id_asoc: str | None, id_ap: str | None, luna: str) -> None:
+        key = self._key(id_asoc, id_ap, luna)
+        attempts = self._misses.get(key, {}).get("n", 0) + 1
+        self._misses[key] = {"n": attempts, "ts": time.time()}
+
+    def miss_pending(self, id_asoc: str | None, id_ap: str | None, luna: str) -> bool:
+        """True while a month that failed to backfill waits out its retry delay."""
+        miss = self._misses.get(self._key(id_asoc, id_ap, luna))
+        if miss is None:
+            return False
+        delay = BACKFILL_RETRY_HOURS * 3600 * 2 ** (int(miss.get("n", 1)) - 1)
+        return time.time() - miss.get("ts", 0) < delay
+
+    def plati_fresh(self, fingerprint: str) -> bool:
+        """True while the ledger was synced for this home-info fingerprint recently."""
+        pl = self._plati
+        if not pl or pl.get("fp") != fingerprint:
+            return False
+        return time.time() - pl.get("ts", 0) <= PLATI_MAX_AGE_HOURS * 3600
+
+    def mark_plati(self, fingerprint: str) -> None:
+        self._plati = {"fp": fingerprint, "ts": time.time()}
+
+    def set_snapshot(self, snapshot: dict[str, Any]) -> None:
+        self._snapshot = snapshot
+        self._evict()
+        self.schedule_save()
+
+    async def async_invalidate(self) -> None:
+        self._months = {}
+        self._misses = {}
+        self._plati = None
+        self.ledger.clear()
+        await self._store.async_save(self._data_to_save())
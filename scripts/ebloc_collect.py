@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""Run the e-Bloc bulk collector without Home Assistant installed.
+
+custom_components/ebloc_ro/__init__.py imports Home Assistant, so the
+package is registered here as a bare namespace before the collector loads.
+"""
+
+import sys
+import types
+from pathlib import Path
+
+PACKAGE = Path(__file__).resolve().parent.parent / "custom_components" / "ebloc_ro"
+
+
+def _main():
+    for name, path in (
+        ("custom_components", PACKAGE.parent),
+        ("custom_components.ebloc_ro", PACKAGE),
+    ):
+        module = types.ModuleType(name)
+        module.__path__ = [str(path)]
+        sys.modules.setdefault(name, module)
+    from custom_components.ebloc_ro.collector import main
+
+    return main()
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
@@ -0,0 +1 @@
+"""Tests for the e-Bloc Romania integration."""
@@ -0,0 +1,41 @@
+"""A year of e-Bloc calendar dates, polled the way the coordinator schedules refreshes."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from custom_components.ebloc_ro.const import DEFAULT_SCAN_INTERVAL_MIN
+from custom_components.ebloc_ro.scheduler import next_interval
+
+FAST = timedelta(minutes=15)
+DEFAULT_INTERVAL = timedelta(minutes=DEFAULT_SCAN_INTERVAL_MIN)
+YEAR_START = datetime(2024, 1, 1, tzinfo=UTC)
+YEAR = timedelta(days=366)
+
+
+def home_on(now: datetime) -> dict:
+    """Home info as e-Bloc shows it on `now`: readings 20-25, paid on the 27th, due the 28th."""
+    month = f"{now.year:04d}-{now.month:02d}"
+    return {
+        "luna_afisata": month,
+        "citire_contoare_start": f"{month}-20",
+        "citire_contoare_end": f"{month}-25",
+        "contoare_citite": "1" if now.day > 22 else "0",
+        "ultima_zi_plata": f"{month}-28",
+        "datorie": "0" if now.day >= 27 else "270,49",
+    }
+
+
+def poll_year(fast: timedelta) -> list[datetime]:
+    """Poll times over the simulated year with `fast` as the configured interval."""
+    t, end = YEAR_START, YEAR_START + YEAR
+    polls: list[datetime] = []
+    while t < end:
+        polls.append(t)
+        t += next_interval(home_on(t), t, fast)
+    return polls
+
+
+def fixed_interval_polls() -> int:
+    """Polls over the same year at the default fixed scan interval."""
+    return int(YEAR / DEFAULT_INTERVAL)
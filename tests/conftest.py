@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ebloc_ro.api import EBlocAPI
+from custom_components.ebloc_ro.const import CONF_COOKIE, DOMAIN
+from custom_components.ebloc_ro.coordinator import EBlocCoordinator
+
+from .fake_ebloc import FakeAssociation, FakeEBloc, generate
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
+
+
+@pytest.fixture
+async def fake_ebloc(
+    monkeypatch, socket_enabled
+) -> AsyncIterator[Callable[..., Awaitable[FakeEBloc]]]:
+    """Start a FakeEBloc and point every EBlocAPI at it."""
+    servers: list[FakeEBloc] = []
+
+    async def _start(associations: list[FakeAssociation] | None = None, **kwargs) -> FakeEBloc:
+        server = FakeEBloc(associations or generate(), **kwargs)
+        monkeypatch.setattr(EBlocAPI, "BASE", await server.start())
+        servers.append(server)
+        return server
+
+    yield _start
+    for server in servers:
+        await server.close()
+
+
+@pytest.fixture
+async def make_coordinator(
+    hass: HomeAssistant,
+) -> AsyncIterator[Callable[..., Awaitable[EBlocCoordinator]]]:
+    """Config entry + coordinator for one apartment, without forwarding platforms."""
+    created: list[EBlocCoordinator] = []
+
+    async def _make(cookie: str, **options) -> EBlocCoordinator:
+        entry = MockConfigEntry(domain=DOMAIN, data={CONF_COOKIE: cookie}, options=options)
+        entry.add_to_hass(hass)
+        coordinator = EBlocCoordinator(hass, entry)
+        await coordinator.async_load_cache()
+        created.append(coordinator)
+        return coordinator
+
+    yield _make
+    for coordinator in created:
+        await coordinator.async_shutdown()
@@ -0,0 +1,251 @@
+"""In-process stand-in for www.e-bloc.ro used by tests and benchmarks.
+
+Serves the five ajax endpoints the integration calls from generated
+associations, with optional latency, HTTP errors and login-page responses.
+Point EBlocAPI at it with base_url=server.url (or by patching EBlocAPI.BASE).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from urllib.parse import parse_qs
+
+from aiohttp import web
+
+LOGIN_PAGE = "<html><form action='login.php'>login <input type='password'></form></html>"
+METER_TYPES = ("Apa rece", "Apa calda", "Repartitor")
+
+
+def month_list(end: str, count: int) -> list[str]:
+    """`count` months ending at `end`, oldest first."""
+    y, m = (int(x) for x in end.split("-"))
+    out = []
+    for _ in range(count):
+        out.append(f"{y:04d}-{m:02d}")
+        m -= 1
+        if m == 0:
+            y, m = y - 1, 12
+    return out[::-1]
+
+
+def next_month(ym: str) -> str:
+    y, m = (int(x) for x in ym.split("-"))
+    return f"{y + m // 12:04d}-{m % 12 + 1:02d}"
+
+
+@dataclass
+class FakeAssociation:
+    id_asoc: str
+    apartments: list[str]
+    meters_per_ap: int = 2
+    # Months that have readings, oldest first; the last one is the displayed month
+    months: list[str] = field(default_factory=lambda: month_list("2024-06", 12))
+    luna_afisata: str = "2024-06"
+    datorie: str = "270,49"
+    citire_start: str = "2024-06-20"
+    citire_end: str = "2024-06-25"
+    ultima_zi_plata: str = "2024-06-30"
+    contoare_citite: str = "0"
+    # Months with receipts, oldest first; defaults to `months`
+    payment_months: list[str] | None = None
+    # Added to the displayed month's indices, to simulate a corrected reading
+    revision: int = 0
+    # Months whose AjaxGetIndexContoare always answers 503
+    failing_months: set[str] = field(default_factory=set)
+
+    def cookie(self, id_ap: str) -> str:
+        return f"PHPSESSID=fake{self.id_asoc}{id_ap}; asoc-cur={self.id_asoc}; home-ap-cur={self.id_asoc}_{id_ap}"
+
+    def meters(self, id_ap: str) -> list[str]:
+        return [f"{id_ap}{k:02d}" for k in range(self.meters_per_ap)]
+
+    def index(self, id_ap: str, meter: str, luna: str) -> int:
+        pos = self.months.index(luna)
+        revision = self.revision if luna == self.luna_afisata else 0
+        return 100 + int(meter[-2:]) * 1000 + pos * (3 + int(id_ap) % 5) + revision
+
+
+def generate(
+    associations: int = 1,
+    apartments: int = 10,
+    meters_per_ap: int = 2,
+    months: int = 12,
+    end: str = "2024-06",
+    gaps: int = 0,
+    seed: int = 0,
+) -> list[FakeAssociation]:
+    """Generated associations; `gaps` months are dropped at random from each history."""
+    rnd = random.Random(seed)
+    out = []
+    for a in range(associations):
+        history = month_list(end, months)
+        for ym in rnd.sample(history[:-2], min(gaps, max(0, len(history) - 2))):
+            history.remove(ym)
+        out.append(
+            FakeAssociation(
+                id_asoc=str(100 + a),
+                apartments=[str(i + 1) for i in range(apartments)],
+                meters_per_ap=meters_per_ap,
+                months=history,
+                luna_afisata=end,
+            )
+        )
+    return out
+
+
+class FakeEBloc:
+    """aiohttp server answering AjaxGetHomeAp, AjaxGetHomeApInfo, AjaxGetPlatiChitante,
+    AjaxGetIndexLuni and AjaxGetIndexContoare."""
+
+    def __init__(
+        self,
+        associations: list[FakeAssociation],
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        login_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.associations = {a.id_asoc: a for a in associations}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.login_rate = login_rate
+        # Cookies whose session is over: every request gets the login page
+        self.expired: set[str] = set()
+        # Endpoints whose next N answers are cut short mid-body
+        self.garbled: Counter[str] = Counter()
+        self.requests: Counter[str] = Counter()
+        # Requests made with pIdAp=-1 (every apartment of the association)
+        self.association_wide: Counter[str] = Counter()
+        self.bytes_sent = 0
+        self._rnd = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+        self.app = web.Application()
+        self.app.router.add_post("/ajax/{endpoint}", self._handle)
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def reset_counters(self) -> None:
+        self.requests.clear()
+        self.association_wide.clear()
+        self.bytes_sent = 0
+
+    async def start(self) -> str:
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> FakeEBloc:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        endpoint = request.match_info["endpoint"]
+        self.requests[endpoint] += 1
+        form = {k: v[0] for k, v in parse_qs(await request.text()).items()}
+        if form.get("pIdAp") == "-1":
+            self.association_wide[endpoint] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self._rnd.random() < self.error_rate:
+            return web.Response(status=503, text="Service Unavailable")
+        cookie = request.headers.get("Cookie", "")
+        if cookie in self.expired or (self.login_rate and self._rnd.random() < self.login_rate):
+            return self._send(LOGIN_PAGE, "text/html")
+        asoc = self.associations.get(form.get("pIdAsoc", ""))
+        if asoc is None:
+            return self._send(LOGIN_PAGE, "text/html")
+        if endpoint == "AjaxGetIndexContoare.php" and form.get("pLuna") in asoc.failing_months:
+            return web.Response(status=503, text="Service Unavailable")
+        handler = getattr(self, "_" + endpoint.removesuffix(".php"), None)
+        if handler is None:
+            return web.Response(status=404)
+        text = json.dumps(handler(asoc, form), ensure_ascii=False)
+        if self.garbled[endpoint] > 0:
+            self.garbled[endpoint] -= 1
+            text = text[: len(text) // 2]
+        return self._send(text)
+
+    def _send(self, text: str, content_type: str = "application/json") -> web.Response:
+        body = text.encode()
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type=content_type)
+
+    # --- endpoints -----------------------------------------------------------
+
+    def _AjaxGetHomeAp(self, asoc: FakeAssociation, form: dict) -> dict:
+        return {str(i + 1): {"id_ap": ap} for i, ap in enumerate(asoc.apartments)}
+
+    def _AjaxGetHomeApInfo(self, asoc: FakeAssociation, form: dict) -> dict:
+        ap = form.get("pIdAp", "0")
+        return {
+            "1": {
+                "cod_client": f"{asoc.id_asoc}-{ap}",
+                "ap": ap,
+                "nr_pers_afisat": "2",
+                "datorie": asoc.datorie,
+                "ultima_zi_plata": asoc.ultima_zi_plata,
+                "luna_afisata": asoc.luna_afisata,
+                "contoare_citite": asoc.contoare_citite,
+                "citire_contoare_start": asoc.citire_start,
+                "citire_contoare_end": asoc.citire_end,
+                "nivel_restanta": "0",
+            }
+        }
+
+    def _AjaxGetPlatiChitante(self, asoc: FakeAssociation, form: dict) -> dict:
+        ap = form.get("pIdAp", "-1")
+        aps = asoc.apartments if ap == "-1" else [ap]
+        rows = {}
+        for a in aps:
+            for luna in asoc.payment_months or asoc.months:
+                rows[str(len(rows) + 1)] = {
+                    "id_chitanta": f"{asoc.id_asoc}{a}{luna.replace('-', '')}",
+                    "luna": luna,
+                    "suma": str(20000 + int(a) * 100 + int(luna[-2:])),
+                    "data": f"{luna}-28",
+                }
+        return rows
+
+    def _AjaxGetIndexLuni(self, asoc: FakeAssociation, form: dict) -> dict:
+        # Like the real site, rows carry other dates too: the next month's reading deadline
+        return {
+            str(i + 1): {"luna": luna, "termen_citire": f"{next_month(luna)}-02"}
+            for i, luna in enumerate(reversed(asoc.months))
+        }
+
+    def _AjaxGetIndexContoare(self, asoc: FakeAssociation, form: dict) -> dict:
+        luna = form.get("pLuna", "")
+        ap = form.get("pIdAp", "-1")
+        if luna not in asoc.months:
+            return {}
+        aps = asoc.apartments if ap == "-1" else [ap]
+        rows = {}
+        for a in aps:
+            for k, meter in enumerate(asoc.meters(a)):
+                rows[str(len(rows) + 1)] = {
+                    "id_ap": a,
+                    "id_contor": meter,
+                    "titlu": METER_TYPES[k % len(METER_TYPES)],
+                    "index_nou": str(asoc.index(a, meter, luna)),
+                    "data": f"{luna}-{20 + k % 5:02d}",
+                }
+        return rows
@@ -0,0 +1,51 @@
+"""The amount parser sensor.py used before money.py, kept as a reference.
+
+Returns lei as a float; amount_cents must agree with it (in bani) on every
+format the old code handled.
+"""
+
+from __future__ import annotations
+
+import re
+
+
+def _parse_amount(value) -> float:
+    """Parse amounts like '270,49', '270.49', '27049', '270.49 RON', '270,49 RON'."""
+    s = str(value).strip()
+    if not s:
+        return 0.0
+
+    original = s
+    # Păstrăm doar cifre, separator decimal și minus
+    cleaned = re.sub(r"[^0-9,.\-]", "", s)
+
+    if "," in cleaned and "." in cleaned:
+        # Alege separatorul decimal după ultima apariție
+        if cleaned.rfind(",") > cleaned.rfind("."):
+            dec = ","
+            thou = "."
+        else:
+            dec = "."
+            thou = ","
+        cleaned = cleaned.replace(thou, "").replace(dec, ".")
+    elif "," in cleaned:
+        # Virgula ca decimal; punctul ca mii
+        cleaned = cleaned.replace(".", "").replace(",", ".")
+    else:
+        # Doar puncte sau fără separatori -> normalizează mai multe puncte
+        parts = cleaned.split(".")
+        if len(parts) > 2:
+            cleaned = "".join(parts[:-1]) + "." + parts[-1]
+
+    try:
+        val = float(cleaned)
+    except Exception:
+        # Fallback: tratează un șir numeric simplu ca bani (ex. '27049' -> 270.49)
+        digits = re.sub(r"[^0-9\-]", "", original)
+        val = float(int(digits)) / 100.0 if digits else 0.0
+
+    # Heuristic: dacă nu exista niciun separator în original și numărul e mare, probabil e în bani
+    if val >= 1000 and ("," not in original and "." not in original):
+        val = val / 100.0
+
+    return round(val, 2)
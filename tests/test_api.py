@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.ebloc_ro import api as api_module
+from custom_components.ebloc_ro.api import CircuitBreaker, EBlocAPI, EBlocError, EBlocUnavailable
+
+from .fake_ebloc import generate
+
+CONTOARE = "AjaxGetIndexContoare.php"
+
+
+@pytest.fixture
+def clock(monkeypatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(api_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.threshold):
+        breaker.before()
+        breaker.failure()
+
+
+def test_open_circuit_refuses_until_cooldown(clock) -> None:
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    _open(breaker)
+    assert breaker.is_open
+    with pytest.raises(EBlocUnavailable):
+        breaker.before()
+
+
+def test_half_open_lets_one_trial_through(clock) -> None:
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    _open(breaker)
+    clock[0] += 61
+    assert breaker.half_open
+
+    breaker.before()  # the trial
+    for _ in range(3):
+        with pytest.raises(EBlocUnavailable):
+            breaker.before()
+
+    breaker.success()
+    assert not breaker.is_open and not breaker.half_open
+    breaker.before()
+    breaker.before()
+
+
+def test_failed_trial_reopens(clock) -> None:
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    _open(breaker)
+    clock[0] += 61
+    breaker.before()
+    breaker.failure()
+    assert breaker.is_open
+    with pytest.raises(EBlocUnavailable):
+        breaker.before()
+    clock[0] += 61
+    breaker.before()
+
+
+def test_abandoned_trial_frees_its_slot(clock) -> None:
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    _open(breaker)
+    clock[0] += 61
+    breaker.before()  # cancelled: never reports back
+    clock[0] += 30
+    with pytest.raises(EBlocUnavailable):
+        breaker.before()
+    clock[0] += 31
+    breaker.before()
+
+
+async def test_identical_requests_are_coalesced(fake_ebloc, make_coordinator, monkeypatch) -> None:
+    (asoc,) = generate(apartments=2, months=2)
+    server = await fake_ebloc([asoc])
+    api = (await make_coordinator(asoc.cookie("1"))).api
+    await api.ensure_session()
+    hits, misses = api.coalesce_hits, api.coalesce_misses
+    server.latency = 0.05
+
+    first, second = await asyncio.gather(
+        api.get_index_contoare("2024-06", "1"), api.get_index_contoare("2024-06", "1")
+    )
+    assert first is second
+    assert server.requests[CONTOARE] == 1
+
+    # Within COALESCE_TTL the completed result is answered from memory
+    assert await api.get_index_contoare("2024-06", "1") is first
+    assert server.requests[CONTOARE] == 1
+    assert (api.coalesce_hits - hits, api.coalesce_misses - misses) == (2, 1)
+
+    monkeypatch.setattr(EBlocAPI, "COALESCE_TTL", 0)
+    await api.get_index_contoare("2024-06", "1")
+    assert server.requests[CONTOARE] == 2
+
+
+async def test_cancel_inflight_stops_orphaned_fetches(fake_ebloc, make_coordinator) -> None:
+    (asoc,) = generate(apartments=2, months=2)
+    server = await fake_ebloc([asoc])
+    api = (await make_coordinator(asoc.cookie("1"))).api
+    await api.ensure_session()
+    server.latency = 0.2
+
+    waiter = asyncio.create_task(api.get_index_luni())
+    await asyncio.sleep(0)
+    (fetch,) = api._inflight.values()
+    waiter.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await waiter
+    # The fetch outlives its cancelled waiter, so the next caller could still join it
+    assert not fetch.done()
+
+    api.cancel_inflight()
+    with pytest.raises(asyncio.CancelledError):
+        await fetch
+    assert not api._inflight
+    # Let the server finish the abandoned request before teardown
+    await asyncio.sleep(0.3)
+
+
+async def test_unchanged_body_returns_the_previous_result(
+    fake_ebloc, make_coordinator, monkeypatch
+) -> None:
+    monkeypatch.setattr(EBlocAPI, "COALESCE_TTL", 0)
+    (asoc,) = generate(apartments=2, months=2)
+    server = await fake_ebloc([asoc])
+    api = (await make_coordinator(asoc.cookie("1"))).api
+
+    first = await api.get_index_contoare("2024-06", "1")
+    again = await api.get_index_contoare("2024-06", "1")
+    # Fetched again, but the identical body is not decoded a second time
+    assert server.requests[CONTOARE] == 2
+    assert again is first
+    assert api.stats[CONTOARE].unchanged == 1
+
+    asoc.revision = 1
+    revised = await api.get_index_contoare("2024-06", "1")
+    assert revised is not first and revised != first
+    assert api.stats[CONTOARE].unchanged == 1
+    # Each request is hashed on its own: another month is not mistaken for this one
+    assert await api.get_index_contoare("2024-05", "1") is not revised
+
+
+async def test_invalid_body_rediscovers_the_session_once(fake_ebloc, make_coordinator) -> None:
+    (asoc,) = generate(apartments=2, months=2)
+    server = await fake_ebloc([asoc])
+    api = (await make_coordinator(asoc.cookie("1"))).api
+    await api.ensure_session()
+    server.reset_counters()
+
+    server.garbled[CONTOARE] = 1
+    rows = await api.get_index_contoare("2024-06", "1")
+    assert {r["id_contor"] for r in rows.values()} == set(asoc.meters("1"))
+    # Cut-off body, re-discovery, then the request again
+    assert server.requests == {CONTOARE: 2, "AjaxGetHomeAp.php": 1}
+    assert api.session_valid
+
+    server.garbled["AjaxGetIndexLuni.php"] = 2
+    with pytest.raises(EBlocError, match="IndexLuni"):
+        await api.get_index_luni()
+    assert server.requests["AjaxGetIndexLuni.php"] == 2
+
+
+async def test_oversized_body_is_refused(fake_ebloc, make_coordinator) -> None:
+    (asoc,) = generate(apartments=2, months=2)
+    await fake_ebloc([asoc])
+    api = (await make_coordinator(asoc.cookie("1"))).api
+    await api.ensure_session()
+    api.max_body = 64
+    with pytest.raises(EBlocError, match="prea mare"):
+        await api.get_index_contoare("2024-06", "1")
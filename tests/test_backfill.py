@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pytest
+
+from custom_components.ebloc_ro import api as api_module
+from custom_components.ebloc_ro.const import BACKFILL_RETRY_HOURS
+
+from .fake_ebloc import generate
+
+CONTOARE = "AjaxGetIndexContoare.php"
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch) -> None:
+    monkeypatch.setattr(api_module, "RETRY_BACKOFF_BASE", 0.001)
+
+
+async def _refresh(coordinator) -> None:
+    await coordinator._async_update_data()
+    if coordinator._backfill_task is not None:
+        await coordinator._backfill_task
+
+
+async def test_failed_month_is_not_requeued_every_refresh(fake_ebloc, make_coordinator) -> None:
+    (asoc,) = generate(apartments=2, months=6)
+    broken = asoc.months[0]
+    asoc.failing_months.add(broken)
+    server = await fake_ebloc([asoc])
+    coordinator = await make_coordinator(asoc.cookie("1"), backfill_rpm=60000)
+    id_asoc, id_ap = coordinator.api.id_asoc, coordinator.api.id_ap
+    # One broken month must not open the circuit for the rest of the test
+    coordinator.api.breaker.threshold = 100
+
+    await _refresh(coordinator)
+    assert coordinator.cache.miss_pending(id_asoc, id_ap, broken)
+    assert coordinator.backfilled_months == 3
+
+    server.reset_counters()
+    coordinator.api.clear_coalesce_cache()
+    await _refresh(coordinator)
+    # Only the two revalidated months; the broken one waits out its retry delay
+    assert server.requests[CONTOARE] == 2
+    assert coordinator.backfill_deferred == 1
+
+    # Once the delay has passed it is tried again; failing again doubles the delay
+    key = coordinator.cache._key(id_asoc, id_ap, broken)
+
+    def _age(hours: float) -> None:
+        # Looked up each time: saving a snapshot rebuilds the misses dict
+        coordinator.cache._misses[key]["ts"] -= hours * 3600
+
+    _age(BACKFILL_RETRY_HOURS + 1)
+    assert not coordinator.cache.miss_pending(id_asoc, id_ap, broken)
+    await _refresh(coordinator)
+    assert coordinator.cache._misses[key]["n"] == 2
+    _age(BACKFILL_RETRY_HOURS + 1)
+    assert coordinator.cache.miss_pending(id_asoc, id_ap, broken)
+    _age(BACKFILL_RETRY_HOURS)
+    assert not coordinator.cache.miss_pending(id_asoc, id_ap, broken)
+
+    # ... and it is cached once it works
+    asoc.failing_months.clear()
+    await _refresh(coordinator)
+    assert coordinator.cache.get_month(id_asoc, id_ap, broken)
+    assert not coordinator.cache.miss_pending(id_asoc, id_ap, broken)
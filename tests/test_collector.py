@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import json
+
+from custom_components.ebloc_ro.collector import main
+
+from .fake_ebloc import generate
+
+
+def _indices(out) -> list[dict]:
+    return [json.loads(line) for line in (out / "indices.jsonl").read_text().splitlines()]
+
+
+async def test_displayed_month_is_refetched_without_duplicates(hass, fake_ebloc, tmp_path) -> None:
+    (asoc,) = generate(apartments=2, meters_per_ap=2, months=3)
+    server = await fake_ebloc([asoc])
+    accounts = tmp_path / "conturi.txt"
+    accounts.write_text(asoc.cookie("1") + "\n")
+    out = tmp_path / "out"
+    argv = [str(accounts), "-o", str(out), "-m", "3", "--base-url", server.url]
+
+    def _run() -> int:
+        return main(argv)
+
+    assert await hass.async_add_executor_job(_run) == 0
+    first = _indices(out)
+    assert len(first) == 3 * 2
+
+    # Nothing changed: the displayed month is fetched again but nothing is appended
+    server.reset_counters()
+    assert await hass.async_add_executor_job(_run) == 0
+    assert server.requests["AjaxGetIndexContoare.php"] == 1
+    assert _indices(out) == first
+
+    # A corrected reading in the displayed month is appended and wins as the last row
+    asoc.revision = 7
+    assert await hass.async_add_executor_job(_run) == 0
+    rows = _indices(out)
+    added = rows[len(first) :]
+    assert {r["luna"] for r in added} == {asoc.luna_afisata}
+    assert len(added) == 2
+    latest = {(r["luna"], r["meter"]): r["index"] for r in rows}
+    assert all(
+        latest[(asoc.luna_afisata, m)] == asoc.index("1", m, asoc.luna_afisata)
+        for m in asoc.meters("1")
+    )
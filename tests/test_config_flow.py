@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import pytest
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ebloc_ro.const import CONF_COOKIE, DOMAIN
+
+from .fake_ebloc import generate
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """Reauth reloads the entry, and the integration depends on recorder."""
+    yield
+
+
+async def _reauth(hass: HomeAssistant, entry: MockConfigEntry, cookie: str):
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_REAUTH, "entry_id": entry.entry_id},
+        data=entry.data,
+    )
+    assert result["step_id"] == "reauth_confirm"
+    return await hass.config_entries.flow.async_configure(result["flow_id"], {CONF_COOKIE: cookie})
+
+
+@pytest.mark.parametrize(
+    ("other", "ap", "reason"),
+    [
+        (False, "1", "reauth_successful"),
+        (False, "2", "reauth_account_mismatch"),
+        # Same apartment number in another association
+        (True, "1", "reauth_account_mismatch"),
+    ],
+)
+async def test_reauth_keeps_the_same_apartment(
+    hass: HomeAssistant, fake_ebloc, other: bool, ap: str, reason: str
+) -> None:
+    asoc, other_asoc = generate(associations=2, apartments=2, months=2)
+    await fake_ebloc([asoc, other_asoc])
+    old = asoc.cookie("1")
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_COOKIE: old}, unique_id=f"ebloc_ro_{asoc.id_asoc}_1"
+    )
+    entry.add_to_hass(hass)
+
+    new = (other_asoc if other else asoc).cookie(ap).replace("PHPSESSID=fake", "PHPSESSID=new")
+    result = await _reauth(hass, entry, new)
+    await hass.async_block_till_done()
+
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == reason
+    assert entry.data[CONF_COOKIE] == (new if reason == "reauth_successful" else old)
+    if entry.state is config_entries.ConfigEntryState.LOADED:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from custom_components.ebloc_ro.consumption import ConsumptionTracker
+from custom_components.ebloc_ro.models import MeterReading, MonthIndex
+
+
+def _months(*readings: tuple[str, int]) -> tuple[MonthIndex, ...]:
+    return tuple(
+        MonthIndex(luna, index, (MeterReading("m1", "Apa rece", index, None),))
+        for luna, index in readings
+    )
+
+
+def _track(*readings: tuple[str, int], digits: int | None = None) -> ConsumptionTracker:
+    tracker = ConsumptionTracker()
+    tracker.update(_months(readings[0]))
+    tracker.meters["m1"].digits = digits
+    tracker.update(_months(*readings[1:]))
+    return tracker
+
+
+def test_monthly_deltas_add_up() -> None:
+    state = _track(("2024-01", 100), ("2024-02", 112), ("2024-03", 130)).meters["m1"]
+    assert (state.total, state.delta, state.index) == (30.0, 18.0, 130)
+
+
+def test_downward_correction_is_not_consumption() -> None:
+    # 950 -> 940 used to be read as a wrap of a 3-digit register (+990)
+    state = _track(("2024-01", 900), ("2024-02", 950), ("2024-03", 940)).meters["m1"]
+    assert state.total == 50.0
+    assert state.delta == 0.0
+    assert state.index == 940
+
+
+def test_replaced_meter_becomes_the_new_baseline() -> None:
+    tracker = _track(("2024-01", 98765), ("2024-02", 98800), ("2024-03", 3))
+    tracker.update(_months(("2024-04", 15)))
+    state = tracker.meters["m1"]
+    assert state.total == 35.0 + 12.0
+
+
+def test_wrap_needs_a_known_register_width() -> None:
+    readings = (("2024-01", 99950), ("2024-02", 99990), ("2024-03", 20))
+    assert _track(*readings).meters["m1"].total == 40.0
+    wrapped = _track(*readings, digits=5).meters["m1"]
+    assert wrapped.delta == 30.0
+    assert wrapped.total == 70.0
+
+
+def test_drop_away_from_the_edges_is_not_a_wrap_even_with_known_width() -> None:
+    state = _track(("2024-01", 500), ("2024-02", 950), ("2024-03", 940), digits=3).meters["m1"]
+    assert state.total == 450.0
+
+
+def test_revised_current_month_replaces_its_delta() -> None:
+    tracker = _track(("2024-01", 100), ("2024-02", 120))
+    tracker.update(_months(("2024-02", 115)))
+    state = tracker.meters["m1"]
+    assert (state.total, state.delta) == (15.0, 15.0)
+
+
+def test_state_round_trips_with_register_width() -> None:
+    tracker = _track(("2024-01", 100), ("2024-02", 120), digits=6)
+    restored = ConsumptionTracker.from_dict(tracker.as_dict())
+    assert restored.meters["m1"] == tracker.meters["m1"]
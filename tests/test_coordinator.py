@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import pytest
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.ebloc_ro.api import EBlocAPI
+
+from .fake_ebloc import generate
+
+
+async def test_refresh_builds_snapshot(fake_ebloc, make_coordinator) -> None:
+    (asoc,) = generate(apartments=3, months=6)
+    server = await fake_ebloc([asoc])
+    coordinator = await make_coordinator(asoc.cookie("2"), backfill_rpm=60000)
+
+    snapshot = await coordinator._async_update_data()
+    await coordinator._backfill_task
+
+    assert snapshot.home.cod_client == f"{asoc.id_asoc}-2"
+    assert snapshot.luna == "2024-06"
+    assert snapshot.payments and snapshot.payments[0].luna == "2024-06"
+    # Two months in the refresh itself, the other four from the backfill
+    assert server.requests["AjaxGetIndexContoare.php"] == 6
+
+
+async def test_login_page_raises_auth_failed(fake_ebloc, make_coordinator) -> None:
+    (asoc,) = generate()
+    server = await fake_ebloc([asoc])
+    cookie = asoc.cookie("1")
+    server.expired.add(cookie)
+    coordinator = await make_coordinator(cookie)
+
+    with pytest.raises(ConfigEntryAuthFailed):
+        await coordinator._async_update_data()
+
+
+async def test_unreachable_site_raises_update_failed(fake_ebloc, make_coordinator) -> None:
+    (asoc,) = generate()
+    await fake_ebloc([asoc], error_rate=1.0)
+    coordinator = await make_coordinator(asoc.cookie("1"))
+
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+
+
+async def test_payments_are_fetched_alongside_home_info(fake_ebloc, make_coordinator) -> None:
+    (asoc,) = generate(apartments=2, months=2)
+    await fake_ebloc([asoc], latency=0.05)
+    coordinator = await make_coordinator(asoc.cookie("1"))
+    await coordinator.api.ensure_session()
+    api = coordinator.api
+    events: list[str] = []
+
+    def _traced(name, fn):
+        async def _call(*args, **kwargs):
+            events.append(f"{name} start")
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                events.append(f"{name} end")
+
+        return _call
+
+    api.get_home_info = _traced("home", api.get_home_info)
+    api.get_plati_rows = _traced("plati", api.get_plati_rows)
+    await coordinator._async_update_data()
+
+    # Receipts do not wait for home info, only the index stage does
+    assert events.index("plati start") < events.index("home end")
+    assert set(coordinator.stage_seconds) == {"home", "index", "plati"}
+
+
+async def test_failed_stage_keeps_previous_data(fake_ebloc, make_coordinator, monkeypatch) -> None:
+    monkeypatch.setattr(EBlocAPI, "COALESCE_TTL", 0)
+    (asoc,) = generate(apartments=2, months=2)
+    server = await fake_ebloc([asoc])
+    coordinator = await make_coordinator(asoc.cookie("1"))
+    coordinator.data = previous = await coordinator._async_update_data()
+
+    async def _broken(luna):
+        raise RuntimeError("index indisponibil")
+
+    # Home info changed, so receipts are refetched, but the body comes back cut short
+    asoc.datorie = "0"
+    server.garbled["AjaxGetPlatiChitante.php"] = 2
+    monkeypatch.setattr(coordinator, "_index", _broken)
+    snapshot = await coordinator._async_update_data()
+
+    assert coordinator.stage_failures == {"index": 1, "plati": 1}
+    assert snapshot.home.raw["datorie"] == "0"
+    assert snapshot.months == previous.months
+    assert snapshot.latest_index == previous.latest_index
+    assert snapshot.payments == previous.payments
+
+
+async def test_failed_index_stage_without_previous_data_fails(
+    fake_ebloc, make_coordinator, monkeypatch
+) -> None:
+    (asoc,) = generate(apartments=2, months=2)
+    await fake_ebloc([asoc])
+    coordinator = await make_coordinator(asoc.cookie("1"))
+
+    async def _broken(luna):
+        raise RuntimeError("index indisponibil")
+
+    monkeypatch.setattr(coordinator, "_index", _broken)
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
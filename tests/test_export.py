@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ebloc_ro.const import CONF_COOKIE, DOMAIN, SERVICE_EXPORT_HISTORY
+
+from .fake_ebloc import generate, month_list
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """The service tests set up the integration, which depends on recorder."""
+    yield
+
+
+async def test_export_without_start_keeps_older_receipts(
+    hass: HomeAssistant, fake_ebloc, make_coordinator, tmp_path
+) -> None:
+    (asoc,) = generate(apartments=2, months=4)
+    # Receipts go back two years, readings only four months
+    asoc.payment_months = month_list(asoc.luna_afisata, 24)
+    await fake_ebloc([asoc])
+    coordinator = await make_coordinator(asoc.cookie("1"), backfill_rpm=60000)
+    coordinator.data = await coordinator._async_update_data()
+
+    target = tmp_path / "istoric.jsonl"
+    summary = await coordinator.async_export_history(target, None, None, "jsonl")
+
+    rows = [json.loads(line) for line in target.read_text(encoding="utf-8").splitlines()]
+    paid = sorted(r["luna"] for r in rows if r["kind"] == "plata")
+    assert paid == asoc.payment_months
+    assert {r["luna"] for r in rows if r["kind"] == "index"} == set(asoc.months)
+    assert summary
+
+
+async def test_export_writes_a_part_file_and_renames_it(
+    hass: HomeAssistant, fake_ebloc, make_coordinator, tmp_path
+) -> None:
+    (asoc,) = generate(apartments=2, months=4)
+    await fake_ebloc([asoc])
+    coordinator = await make_coordinator(asoc.cookie("1"))
+    coordinator.data = await coordinator._async_update_data()
+    target = tmp_path / "istoric.csv"
+    part = tmp_path / "istoric.csv.part"
+    target.write_text("export anterior\n", encoding="utf-8")
+
+    fetch_months = coordinator._fetch_months
+    seen: list[tuple[bool, str]] = []
+
+    async def _fetch_months(months):
+        # While the export runs, rows go to the .part file and the old export stays whole
+        seen.append((part.exists(), target.read_text(encoding="utf-8")))
+        return await fetch_months(months)
+
+    coordinator._fetch_months = _fetch_months
+    await coordinator.async_export_history(target, None, None, "csv")
+
+    assert seen and all(s == (True, "export anterior\n") for s in seen)
+    assert not part.exists()
+    assert target.read_text(encoding="utf-8").startswith("kind,id_asoc,id_ap,luna")
+
+    # A failed export removes its .part file and leaves the previous one in place
+    async def _broken(months):
+        raise RuntimeError("e-bloc.ro indisponibil")
+
+    coordinator._fetch_months = _broken
+    previous = target.read_text(encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        await coordinator.async_export_history(target, None, None, "csv")
+    assert not part.exists()
+    assert target.read_text(encoding="utf-8") == previous
+
+
+async def test_export_path_must_stay_in_config_dir(hass: HomeAssistant, fake_ebloc) -> None:
+    (asoc,) = generate(apartments=1, months=2)
+    await fake_ebloc([asoc])
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_COOKIE: asoc.cookie("1")})
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    outside = os.path.dirname(os.path.realpath(hass.config.config_dir))
+    link = hass.config.path("exports")
+    os.symlink(outside, link)
+    try:
+        for filename in ("../istoric.csv", "exports/istoric.csv", ""):
+            with pytest.raises(HomeAssistantError):
+                await hass.services.async_call(
+                    DOMAIN,
+                    SERVICE_EXPORT_HISTORY,
+                    {"entry_id": entry.entry_id, "filename": filename},
+                    blocking=True,
+                    return_response=True,
+                )
+    finally:
+        os.unlink(link)
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
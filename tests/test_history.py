@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from custom_components.ebloc_ro import history
+from custom_components.ebloc_ro.history import (
+    _select_numpy,
+    _select_python,
+    available_months,
+    flatten,
+    month_range,
+    prev_months,
+    reduce_history,
+)
+
+
+def test_prev_months_crosses_years() -> None:
+    assert prev_months("2024-02", 4) == ["2024-02", "2024-01", "2023-12", "2023-11"]
+
+
+def test_month_range_is_inclusive() -> None:
+    assert month_range("2023-11", "2024-02") == ["2023-11", "2023-12", "2024-01", "2024-02"]
+
+
+def test_available_months_reads_luna_field() -> None:
+    payload = {
+        "1": {"luna": "2024-06", "citire_start": "2024-07-02", "titlu": "Iunie 2024"},
+        "2": {"luna": "2024-05-01", "obs": "corectat 2023-12"},
+        "3": {"luna": "2024-13"},
+        "4": "2022-01",
+    }
+    assert available_months(payload) == {"2024-06", "2024-05"}
+
+
+def test_available_months_accepts_lists_and_rejects_junk() -> None:
+    assert available_months([{"luna": "2024-01"}, {"luna": ""}, None]) == {"2024-01"}
+    assert available_months("2024-01") == set()
+    assert available_months(None) == set()
+
+
+def _row(meter: str, index, data: str | None = None, id_ap: str = "1") -> dict:
+    row = {"id_ap": id_ap, "id_contor": meter, "titlu": "Apa rece", "index_nou": index}
+    if data is not None:
+        row["data"] = data
+    return row
+
+
+def test_reduce_history_keeps_the_latest_reading_per_meter() -> None:
+    payloads = {
+        "2024-06": {
+            # Corrected reading: the later date wins even with a smaller index
+            "1": _row("A", 130, "2024-06-21"),
+            "2": _row("A", 125, "2024-06-24"),
+            # Undated rows: the larger index wins
+            "3": _row("B", 40),
+            "4": _row("B", 45),
+            "5": _row("A", 999, "2024-06-25", id_ap="2"),
+            "6": _row("C", "n/a", "2024-06-25"),
+        },
+        "2024-05": {"1": _row("A", 110, "2024-05-22"), "2": _row("B", 30, "not-a-date")},
+        "2024-04": "junk",
+    }
+    months = ["2024-06", "2024-05", "2024-04"]
+    meters, index_history, latest = reduce_history(payloads, months, "1")
+
+    assert meters == {
+        "2024-06": {
+            "A": {"tip": "Apa rece", "index": 125, "data": "2024-06-24"},
+            "B": {"tip": "Apa rece", "index": 45, "data": None},
+        },
+        "2024-05": {
+            "A": {"tip": "Apa rece", "index": 110, "data": "2024-05-22"},
+            "B": {"tip": "Apa rece", "index": 30, "data": None},
+        },
+    }
+    assert index_history == {"2024-06": 125, "2024-05": 110}
+    assert latest == 125
+    assert reduce_history({}, months, "1") == ({}, {}, None)
+
+
+@pytest.mark.skipif(history.np is None, reason="numpy not installed")
+def test_numpy_selection_matches_python() -> None:
+    rnd = random.Random(7)
+    months = prev_months("2024-06", 24)
+    payloads = {
+        ym: {
+            str(k): _row(
+                f"M{rnd.randrange(6)}",
+                rnd.randrange(50),
+                rnd.choice([None, f"{ym}-{rnd.randrange(1, 29):02d}", f"{ym}-15"]),
+            )
+            for k in range(40)
+        }
+        for ym in months
+    }
+    cols = flatten(payloads, months, "1")
+    assert sorted(_select_numpy(cols)) == sorted(_select_python(cols))
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from custom_components.ebloc_ro.api import EBlocAPI
+
+from .fake_ebloc import generate
+
+CONTOARE = "AjaxGetIndexContoare.php"
+
+
+async def test_apartments_fetch_their_own_rows(fake_ebloc, make_coordinator) -> None:
+    (asoc,) = generate(apartments=50, months=2)
+    server = await fake_ebloc([asoc])
+    first = await make_coordinator(asoc.cookie("1"))
+    second = await make_coordinator(asoc.cookie("2"))
+    assert first.hub is second.hub and first.hub.shared
+    assert not first.hub.shares_contoare
+
+    for coordinator in (first, second):
+        coordinator.data = await coordinator._async_update_data()
+
+    # Two apartments out of fifty: the association-wide payload would cost 25x more
+    assert server.requests[CONTOARE] == 4
+    assert server.association_wide[CONTOARE] == 0
+    # Each coordinator parsed its own apartment out of the shared session
+    assert second.data is not None
+    assert second.data.luna == asoc.luna_afisata
+    assert second.data.home.cod_client == f"{asoc.id_asoc}-2"
+    assert second.data.latest_index in {
+        asoc.index("2", meter, asoc.luna_afisata) for meter in asoc.meters("2")
+    }
+    assert second.data.payments
+    for payment in second.data.payments:
+        assert payment.raw["id_chitanta"] == f"{asoc.id_asoc}2{payment.luna.replace('-', '')}"
+
+
+async def test_whole_association_entry_shares_its_payload(
+    fake_ebloc, make_coordinator, monkeypatch
+) -> None:
+    monkeypatch.setattr(EBlocAPI, "COALESCE_TTL", 0)
+    (asoc,) = generate(apartments=5, months=2)
+    server = await fake_ebloc([asoc])
+    everyone = await make_coordinator(f"PHPSESSID=admin; asoc-cur={asoc.id_asoc}")
+    one = await make_coordinator(asoc.cookie("3"))
+    assert one.hub.shares_contoare
+
+    await everyone._async_update_data()
+    server.reset_counters()
+    await one._async_update_data()
+    assert server.requests[CONTOARE] == 0
+
+    # However long the poll interval gets, the shared payload is refetched within the hour
+    one.update_interval = timedelta(hours=24)
+    for (kind, luna), (ts, payload) in list(one.hub._cache.items()):
+        one.hub._cache[kind, luna] = (ts - 3601, payload)
+    await one._async_update_data()
+    assert server.association_wide[CONTOARE] == 2
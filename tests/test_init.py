@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ebloc_ro.const import CONF_COOKIE, DOMAIN, STORAGE_VERSION
+
+from .fake_ebloc import generate
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """These tests set up the integration, which depends on recorder."""
+    yield
+
+
+async def test_setup_starts_from_the_saved_snapshot(
+    hass: HomeAssistant, hass_storage, fake_ebloc, make_coordinator
+) -> None:
+    (asoc,) = generate(apartments=2, months=2)
+    server = await fake_ebloc([asoc])
+    earlier = await make_coordinator(asoc.cookie("1"))
+    await earlier._async_update_data()
+    saved = json.loads(json.dumps(earlier.cache.snapshot))
+    # Setting up the domain would load this entry too
+    await hass.config_entries.async_remove(earlier.entry.entry_id)
+
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_COOKIE: asoc.cookie("1")})
+    entry.add_to_hass(hass)
+    key = f"{DOMAIN}.{entry.entry_id}"
+    hass_storage[key] = {"version": STORAGE_VERSION, "key": key, "data": {"snapshot": saved}}
+    # The debt was paid since the snapshot was saved, and e-bloc.ro is slow today
+    asoc.datorie = "0"
+    server.latency = 0.5
+    server.reset_counters()
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"ebloc_factura_restanta_{asoc.id_asoc}_1"
+    )
+    # Entities are up with the saved values before any request has been answered
+    assert coordinator.restored
+    assert server.total_requests <= 1
+    assert hass.states.get(entity_id).state == "270.49"
+
+    for _ in range(100):
+        if not coordinator.restored:
+            break
+        await asyncio.sleep(0.05)
+    await hass.async_block_till_done()
+    assert not coordinator.restored
+    assert server.total_requests
+    assert hass.states.get(entity_id).state == "0.0"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
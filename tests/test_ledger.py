@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from custom_components.ebloc_ro.api import EBlocAPI
+from custom_components.ebloc_ro.ledger import PaymentLedger, receipt_key
+
+from .fake_ebloc import generate, month_list
+
+PLATI = "AjaxGetPlatiChitante.php"
+
+
+def _receipt(n: int, luna: str, suma: str) -> dict:
+    """A PlatiChitante row; suma is in bani."""
+    return {"id_chitanta": str(n), "luna": luna, "suma": suma, "data": f"{luna}-28"}
+
+
+def test_merge_adds_new_and_replaces_changed_receipts() -> None:
+    ledger = PaymentLedger()
+    assert ledger.merge([_receipt(1, "2023-12", "10000"), _receipt(2, "2024-01", "20000")]) == 2
+    assert ledger.merge([_receipt(1, "2023-12", "10000")]) == 0
+    # A corrected amount replaces the receipt and the yearly total
+    assert ledger.merge([_receipt(2, "2024-01", "25000"), _receipt(3, "2024-02", "5050")]) == 2
+
+    assert len(ledger) == 3
+    assert ledger.total_paid(2023) == 10000
+    assert ledger.total_paid("2024") == 25000 + 5050
+    assert [r["luna"] for r in ledger.top(2)] == ["2024-02", "2024-01"]
+    assert [r["luna"] for r in ledger.top(None)] == ["2024-02", "2024-01", "2023-12"]
+    assert [key for key, _ in ledger.between("2024-01", "2024-02")] == [
+        "id_chitanta:2",
+        "id_chitanta:3",
+    ]
+    assert [key for key, _ in ledger.between("", "2023-12")] == ["id_chitanta:1"]
+
+    restored = PaymentLedger.from_list(ledger.as_list())
+    assert restored.top(None) == ledger.top(None)
+    assert restored.total_paid(2024) == ledger.total_paid(2024)
+
+
+def test_receipt_key_without_an_id() -> None:
+    assert receipt_key({"nr_chitanta": "7", "id": "9"}) == "nr_chitanta:7"
+    assert receipt_key({"luna": "2024-01", "suma": "10", "data": "2024-01-28"}) == (
+        "luna:2024-01:10:2024-01-28"
+    )
+
+
+async def test_receipts_are_fetched_only_when_home_info_changes(
+    fake_ebloc, make_coordinator, monkeypatch
+) -> None:
+    monkeypatch.setattr(EBlocAPI, "COALESCE_TTL", 0)
+    (asoc,) = generate(apartments=2, months=2)
+    asoc.payment_months = month_list(asoc.luna_afisata, 24)
+    server = await fake_ebloc([asoc])
+    coordinator = await make_coordinator(asoc.cookie("1"), history_months=6)
+
+    coordinator.data = await coordinator._async_update_data()
+    assert server.requests[PLATI] == 1
+    # Every receipt is kept; the snapshot shows the newest history_months of them
+    assert len(coordinator.cache.ledger) == 24
+    assert [p.luna for p in coordinator.data.payments] == month_list(asoc.luna_afisata, 6)[::-1]
+
+    coordinator.data = await coordinator._async_update_data()
+    assert server.requests[PLATI] == 1
+
+    asoc.datorie = "0"
+    coordinator.data = await coordinator._async_update_data()
+    assert server.requests[PLATI] == 2
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import pytest
+
+from custom_components.ebloc_ro.money import amount_cents, bani, fmt_lei, lei
+
+from .legacy_money import _parse_amount
+
+FORMATS = [
+    "270,49",
+    "270.49",
+    "27049",
+    "270.49 RON",
+    "270,49 RON",
+    "1.234,56 RON",
+    "1,234.56",
+    "1234.56",
+    "1234",
+    "999",
+    "0",
+    "0,00",
+    "7,5",
+    "-12,50",
+    "-1.234,56",
+    "12.345.678,9",
+    "1.234.567",
+    "  42  ",
+    "lei 15,5",
+    "100000",
+    "1000 RON",
+    "abc",
+    "",
+    # str.isdigit() is true for these, but they are not amounts
+    "²",
+    "12²",
+    "١٢",
+    "١٢٣٤",
+]
+
+
+@pytest.mark.parametrize("value", FORMATS)
+def test_amount_cents_matches_legacy_parser(value: str) -> None:
+    assert amount_cents(value) == round(_parse_amount(value) * 100)
+
+
+def test_amount_cents_none_and_numbers() -> None:
+    assert amount_cents(None) == 0
+    assert amount_cents(270.49) == 27049
+    assert amount_cents(27049) == 27049
+
+
+def test_bani_and_formatting() -> None:
+    assert bani("27049") == 27049
+    assert bani("270.6") == 271
+    assert bani(None) == 0
+    assert lei(27049) == 270.49
+    assert fmt_lei(27049) == "270.49 RON"
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+
+from custom_components.ebloc_ro.scheduler import (
+    FAILURE_BACKOFF_MAX,
+    QUIET_INTERVAL,
+    failure_interval,
+    next_interval,
+)
+
+from .calendar_sim import DEFAULT_INTERVAL, FAST, fixed_interval_polls, home_on, poll_year
+
+NOW = datetime(2024, 6, 10, 12, tzinfo=UTC)
+
+
+@pytest.mark.parametrize(
+    "home",
+    [
+        {},
+        {"luna_afisata": "2024-06", "datorie": "0"},
+        {"citire_contoare_start": "15-06-2024", "citire_contoare_end": "25-06-2024"},
+        {"ultima_zi_plata": "iunie 30", "datorie": "270,49"},
+        {**home_on(NOW), "citire_contoare_end": "2024/06/25"},
+    ],
+)
+def test_missing_or_unparseable_dates_keep_fast(home: dict) -> None:
+    assert next_interval(home, NOW, FAST) == FAST
+
+
+def test_nothing_due_backs_off() -> None:
+    home = {**home_on(NOW), "contoare_citite": "1", "datorie": "0"}
+    assert next_interval(home, NOW, FAST) == QUIET_INTERVAL
+
+
+@pytest.mark.parametrize("failures", [1, 2, 5, 30])
+def test_failure_interval_never_below_fast(failures: int) -> None:
+    slow = timedelta(hours=12)
+    assert failure_interval(failures, slow) >= slow
+    assert failure_interval(failures) <= FAILURE_BACKOFF_MAX * 1.2
+
+
+def test_year_long_calendar() -> None:
+    """Poll for a year as the coordinator would and check no window or deadline is missed."""
+    polls = poll_year(FAST)
+
+    gaps = [b - a for a, b in zip(polls, polls[1:], strict=False)]
+    assert max(gaps) <= QUIET_INTERVAL
+
+    by_day: dict[date, int] = {}
+    for p in polls:
+        by_day[p.date()] = by_day.get(p.date(), 0) + 1
+    for month in range(1, 13):
+        # Reading window (from the day before until sent on the 22nd) at full rate
+        for day in (19, 20, 21, 22):
+            assert by_day.get(date(2024, month, day), 0) >= 90, (month, day)
+        # Payment deadline lead (from the 25th while still owed)
+        for day in (25, 26):
+            assert by_day.get(date(2024, month, day), 0) >= 90, (month, day)
+        # Quiet stretch after paying
+        assert by_day.get(date(2024, month, 28), 0) <= 4
+
+
+def test_year_at_default_interval_beats_fixed_polling() -> None:
+    """With the default interval, at least 3.5x fewer polls than that interval fixed all year."""
+    baseline = fixed_interval_polls()
+    assert baseline == 366 * 24
+    assert len(poll_year(DEFAULT_INTERVAL)) * 3.5 <= baseline
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import pytest
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.const import ATTR_DEVICE_CLASS, ATTR_UNIT_OF_MEASUREMENT, UnitOfVolume
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ebloc_ro.const import CONF_COOKIE, DOMAIN
+
+from .fake_ebloc import generate
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """The integration depends on recorder, which must start before hass."""
+    yield
+
+
+async def test_consumption_sensor_units(hass: HomeAssistant, fake_ebloc) -> None:
+    (asoc,) = generate(apartments=2, meters_per_ap=3, months=3)
+    await fake_ebloc([asoc])
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_COOKIE: asoc.cookie("1")}, options={"backfill_rpm": 60000}
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    states = {}
+    for meter, tip in zip(asoc.meters("1"), ("Apa rece", "Apa calda", "Repartitor"), strict=True):
+        entity_id = registry.async_get_entity_id(
+            "sensor", DOMAIN, f"ebloc_consum_{asoc.id_asoc}_1_{meter}"
+        )
+        states[tip] = hass.states.get(entity_id)
+
+    for tip in ("Apa rece", "Apa calda"):
+        assert states[tip].attributes[ATTR_DEVICE_CLASS] == SensorDeviceClass.WATER
+        assert states[tip].attributes[ATTR_UNIT_OF_MEASUREMENT] == UnitOfVolume.CUBIC_METERS
+    assert ATTR_DEVICE_CLASS not in states["Repartitor"].attributes
+    assert ATTR_UNIT_OF_MEASUREMENT not in states["Repartitor"].attributes
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+SCOPED = (
+    "ebloc_date_utilizator",
+    "ebloc_factura_restanta",
+    "ebloc_index_contor",
+    "ebloc_istoric_facturi",
+    "ebloc_durata_actualizare",
+)
+
+
+async def test_sensors_are_scoped_per_entry(hass: HomeAssistant, fake_ebloc) -> None:
+    (asoc,) = generate(apartments=2, months=2)
+    await fake_ebloc([asoc])
+    registry = er.async_get(hass)
+    entries = []
+    for ap in ("1", "2"):
+        entry = MockConfigEntry(domain=DOMAIN, data={CONF_COOKIE: asoc.cookie(ap)})
+        entry.add_to_hass(hass)
+        entries.append(entry)
+    # Written by an older version: one shared unique_id per sensor, owned by the first entry
+    old = {
+        base: registry.async_get_or_create("sensor", DOMAIN, base, config_entry=entries[0])
+        for base in SCOPED
+    }
+
+    # Setting up the domain loads both entries
+    assert await hass.config_entries.async_setup(entries[0].entry_id)
+    await hass.async_block_till_done()
+
+    for base in SCOPED:
+        for ap in ("1", "2"):
+            entity_id = registry.async_get_entity_id(
+                "sensor", DOMAIN, f"{base}_{asoc.id_asoc}_{ap}"
+            )
+            assert entity_id
+            assert registry.async_get(entity_id).config_entry_id == entries[int(ap) - 1].entry_id
+        assert registry.async_get_entity_id("sensor", DOMAIN, base) is None
+        assert registry.async_get(old[base].entity_id).unique_id == f"{base}_{asoc.id_asoc}_1"
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
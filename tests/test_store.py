@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.ebloc_ro import store as store_module
+from custom_components.ebloc_ro.store import EBlocCache
+
+from .fake_ebloc import month_list
+
+
+async def test_eviction_follows_month_age_not_fetch_time(hass: HomeAssistant) -> None:
+    cache = EBlocCache(hass, "test")
+    months = month_list("2024-06", 130)
+    for ym in months:
+        cache.set_month("100", "1", ym, {"1": {"luna": ym}})
+    cache.note_miss("100", "1", "2013-01")
+    # Fetched long ago: a closed month is still good
+    for entry in cache._months.values():
+        entry["ts"] = 0
+
+    cache._evict()
+
+    kept = sorted(k.rsplit("_", 1)[-1] for k in cache._months)
+    assert kept == months[-120:]
+    assert kept[0] == "2014-07"
+    assert cache.get_month("100", "1", "2015-01") == {"1": {"luna": "2015-01"}}
+    assert not cache._misses
+
+
+async def test_eviction_caps_the_number_of_months(hass: HomeAssistant, monkeypatch) -> None:
+    monkeypatch.setattr(store_module, "CACHE_MAX_MONTHS", 5)
+    cache = EBlocCache(hass, "test")
+    for ym in month_list("2024-06", 8):
+        cache.set_month("100", "1", ym, {})
+
+    cache._evict()
+
+    assert sorted(k.rsplit("_", 1)[-1] for k in cache._months) == month_list("2024-06", 5)